@@ -1,17 +1,15 @@
 import streamlit as st
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import re
-import datetime
+import os
 import urllib.parse
 import random
 import string
 import time
 
-# Importera Selenium
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+# "app": skrapa i appen (med cache), "extern": läs bara det scrape_worker.py sparat,
+# "snapshot": läs bara ögonblicksbilden som scrape_worker.py --snapshot skriver
+SCRAPE_MODE = os.environ.get("UGL_SCRAPE_MODE", "app")
+# Port för /metrics i Prometheus-format (av om den inte är satt)
+METRICS_PORT = os.environ.get("UGL_METRICS_PORT")
 
 st.set_page_config(page_title="UGL Kurser", page_icon="📅")
 st.title("UGL Kurser – Datum och priser")
@@ -29,12 +27,19 @@ if "random_id" not in st.session_state:
 ####################################
 # 2) SIDOPANEL: Kontaktuppgifter
 ####################################
-st.sidebar.header("Kontaktuppgifter")
-col_namn, col_tel = st.sidebar.columns(2)
-namn = col_namn.text_input("Namn")
-telefon = col_tel.text_input("Telefon")
-mail = st.sidebar.text_input("Mail")
-st.sidebar.text_input("ID", value=st.session_state.random_id, disabled=True)
+# Egen fragment: att skriva i fälten kör bara om den här delen. Värdena
+# läses från st.session_state där de behövs (avsnitt 11).
+@st.fragment
+def contact_panel():
+    st.header("Kontaktuppgifter")
+    col_namn, col_tel = st.columns(2)
+    col_namn.text_input("Namn", key="namn")
+    col_tel.text_input("Telefon", key="telefon")
+    st.text_input("Mail", key="mail")
+    st.text_input("ID", value=st.session_state.random_id, disabled=True)
+
+with st.sidebar:
+    contact_panel()
 
 ####################################
 # 3) SIDOPANEL: Filter
@@ -50,6 +55,27 @@ col_far, col_res = st.sidebar.columns(2)
 user_transport = col_far.selectbox("Färdsätt", options=["Bil", "Kollektivt"])
 user_restid = col_res.number_input("Restid (timmar)", min_value=0, value=0, step=1)
 
+# pandas, skrapning och restider importeras först här så att rubrik och
+# sidopanel hinner ritas medan de laddas (se benchmarks/bench_imports.py)
+import pandas as pd
+
+from courses import display_frame
+from dates import weeks_date_span
+from email_utils import start_mail_worker
+from filters import apply_filters
+from metrics import metrics, serve as serve_metrics
+from scrapers import combine_frames, combined_aliases, fetch_all_providers, read_providers_from_store
+from templates import course_card, selection_mail
+from travel import get_matrix
+
+if METRICS_PORT:
+    serve_metrics(int(METRICS_PORT))
+# En gång per process (se mail_queue.start_worker)
+start_mail_worker()
+
+if user_location.strip() and get_matrix().resolve(user_location) is None:
+    st.sidebar.caption("Okänd plats, restidsfiltret används inte.")
+
 ####################################
 # 4) Hjälpfunktioner
 ####################################
@@ -74,399 +100,227 @@ def parse_week_filter(week_str):
                 pass
     return allowed
 
-def get_travel_time(customer, course, mode):
-    """
-    Returnerar restid baserat på kundens plats och kursens ort (båda i gemener).
-    Exempel: Om kursens ort är "eskilstuna" används våra tider.
-    """
-    times = {
-        "Bil": {
-            "västerås": {"eskilstuna": 1.0},
-            "kiruna": {"eskilstuna": 6.0},
-            "stockholm": {"eskilstuna": 1.5},
-            "eskilstuna": {"eskilstuna": 0.0},
-        },
-        "Kollektivt": {
-            "västerås": {"eskilstuna": 2.0},
-            "kiruna": {"eskilstuna": 8.0},
-            "stockholm": {"eskilstuna": 2.5},
-            "eskilstuna": {"eskilstuna": 0.0},
-        }
-    }
-    cust = customer.strip().lower()
-    crs = course.strip().lower()
-    try:
-        return times[mode][cust].get(crs, 99.0)
-    except:
-        return 99.0
-
-def extract_price(price_str):
-    try:
-        return int(re.sub(r'\D', '', price_str))
-    except:
-        return 0
-
-def add_space_between_words(text):
-    return re.sub(r'(?<=[a-zåäö])(?=[A-ZÅÄÖ])', ' ', text)
-
-def format_spots(spots):
-    text = spots.strip()
-    if "fullbokad" in text.lower():
-        color = "red"
-    elif "få" in text.lower():
-        color = "orange"
-    else:
-        try:
-            digits = re.sub(r"\D", "", text)
-            num = int(digits) if digits else 0
-            color = "green" if num >= 3 else "orange"
-        except:
-            color = "orange"
-    return f'<span style="color: {color}; font-weight: bold;">✅</span> {text}'
-
-def format_course_date(datum):
-    """Omvandlar 'YYYY-MM-DD - YYYY-MM-DD' till 'DD/M - DD/M YY'."""
-    parts = datum.split(" - ")
-    if len(parts) == 2:
-        try:
-            s_year, s_month, s_day = parts[0].split("-")
-            e_year, e_month, e_day = parts[1].split("-")
-            return f"{int(s_day)}/{int(s_month)} - {int(e_day)}/{int(e_month)} {s_year[-2:]}"
-        except:
-            return datum
-    return datum
-
-def combine_handledare(h1, h2):
-    if h1 and h2:
-        return f"{h1} {h2}"
-    else:
-        return h1 or h2
-
 ####################################
-# 5) Hämta UGL-data (med requests)
+# 5-7) Hämta UGL-, Rezon- och Corecode-data (parallellt, se scrapers.py)
 ####################################
-UGL_URL = "https://www.uglkurser.se/datumochpriser.php"
-
-def fetch_ugl_data():
-    resp = requests.get(UGL_URL)
-    soup = BeautifulSoup(resp.content, "html.parser")
-    table = soup.find("table")
-    rows = table.find_all("tr")[1:]
-    data = []
-    for row in rows:
-        cols = row.find_all("td")
-        if len(cols) < 4:
-            continue
-        kursdatum_rader = list(cols[0].stripped_strings)
-        datum = kursdatum_rader[0] if kursdatum_rader else ""
-        datum = format_course_date(datum)
-        vecka = kursdatum_rader[1].replace("Vecka", "").strip() if len(kursdatum_rader) > 1 else ""
-        vecka = f"📅 Vecka {vecka}"
-        kursplats_rader = list(cols[1].stripped_strings)
-        anlaggning_och_ort = kursplats_rader[0] if kursplats_rader else ""
-        splitted = anlaggning_och_ort.split(",")
-        anlaggning = splitted[0].strip()
-        ort = splitted[1].strip() if len(splitted)>1 else ""
-        platser_kvar = ""
-        if len(kursplats_rader) > 1 and "Platser kvar:" in kursplats_rader[1]:
-            platser_kvar = kursplats_rader[1].split("Platser kvar:")[1].strip()
-        kursledare_rader = list(cols[2].stripped_strings)
-        h1 = add_space_between_words(kursledare_rader[0]) if kursledare_rader else ""
-        h2 = add_space_between_words(kursledare_rader[1]) if len(kursledare_rader)>1 else ""
-        handledare = combine_handledare(h1, h2)
-        pris_rader = list(cols[3].stripped_strings)
-        pris = pris_rader[0] if pris_rader else ""
-        data.append({
-            "Vecka": vecka,
-            "Datum": datum,
-            "Anläggning": anlaggning,
-            "Ort": ort,
-            "Handledare": handledare,
-            "Pris": pris,
-            "Platser kvar": platser_kvar,
-            "Källa": "Uglkurser"
-        })
-    return pd.DataFrame(data)
-
-ugl_df = fetch_ugl_data()
+if SCRAPE_MODE in ("extern", "snapshot"):
+    # Skrapningen sköts av scrape_worker.py, appen läser bara från databasen
+    # eller från ögonblicksbilden (som flera instanser kan dela, se snapshot.py)
+    if SCRAPE_MODE == "snapshot":
+        from snapshot import read_providers_from_snapshot
 
-####################################
-# 6) Hämta Rezon-data (med requests)
-####################################
-def process_rezon_row(row_dict):
-    kursdatum = row_dict.get("Kursdatum", "")
-    week_part = ""
-    date_part = kursdatum.strip()
-    if "Vecka" in kursdatum:
-        parts = kursdatum.split("Vecka", 1)
-        date_part = parts[0].strip()
-        week_part = parts[1].strip()
-    new_date = format_course_date(date_part)
-    new_week = f"📅 Vecka {week_part}" if week_part else ""
-    utbildningsort = row_dict.get("Utbildningsort", "")
-    if "Tylebäck" in utbildningsort:
-        new_anlaggning = "🏨 Sundbyholms Slott"
-        new_ort = "📍 Eskilstuna"
+        frames, provider_status = read_providers_from_snapshot()
     else:
-        utd = add_space_between_words(utbildningsort)
-        parts = utd.split()
-        new_anlaggning = parts[0] if parts else utd
-        new_ort = " ".join(parts[1:]) if len(parts)>1 else ""
-    handledare = row_dict.get("Handledare", "")
-    def split_handledare(text):
-        m = re.findall(r'[A-ZÅÄÖ][^A-ZÅÄÖ]+', text)
-        if len(m) >= 2:
-            return m[0].strip(), m[1].strip()
-        else:
-            sp = text.split()
-            if len(sp) >= 2:
-                return sp[0], " ".join(sp[1:])
-            else:
-                return text, ""
-    h1, h2 = split_handledare(add_space_between_words(handledare))
-    handledare_combined = combine_handledare(h1, h2)
-    pris_text = row_dict.get("Pris", "")
-    prices = re.findall(r'(\d[\d\s]*)\s*kr', pris_text)
-    total_price = 0
-    for p in prices:
-        try:
-            total_price += int(p.replace(" ", ""))
-        except:
-            pass
-    new_pris = f"{total_price} kr"
-    boknings = row_dict.get("Bokningsdetaljer", "")
-    new_spots = "Få" if "fullbokad" in boknings.lower() else boknings
-    return {
-        "Vecka": new_week,
-        "Datum": new_date,
-        "Anläggning": new_anlaggning,
-        "Ort": new_ort,
-        "Handledare": handledare_combined,
-        "Pris": new_pris,
-        "Platser kvar": new_spots,
-        "Källa": "Rezon"
-    }
-
-def fetch_rezon_data():
-    rez_url = "https://rezon.se/kurskategorier/ugl/"
-    resp = requests.get(rez_url)
-    soup = BeautifulSoup(resp.content, "html.parser")
-    table = soup.find("table")
-    if not table:
-        return []
-    headers = [th.get_text(strip=True) for th in table.find("tr").find_all("th")]
-    rows_data = []
-    for tr in table.find_all("tr")[1:]:
-        cells = [td.get_text(strip=True) for td in tr.find_all("td")]
-        if cells:
-            row_dict = dict(zip(headers, cells))
-            processed = process_rezon_row(row_dict)
-            rows_data.append(processed)
-    return rows_data
-
-rezon_list = fetch_rezon_data()
-rezon_df = pd.DataFrame(rezon_list)
+        frames, provider_status = read_providers_from_store()
+    for provider_name, info in provider_status.items():
+        st.sidebar.caption(f"{provider_name}: {info['meddelande']}")
+else:
+    refresh_now = st.sidebar.button("Uppdatera kursdata nu")
+    frames, provider_status = fetch_all_providers(refresh=refresh_now)
+ugl_df = frames["Uglkurser"]
+rezon_df = frames["Rezon"]
+corecode_df = frames["Corecode"]
 
-####################################
-# 7) Hämta Corecode-data (med Selenium)
-####################################
-def fetch_corecode_data():
-    corecode_url = "https://www.corecode.se/oppna-utbildningar/ugl-utbildning?showall=true&filterBookables=-1"
-    # Ställ in Chrome i headless-läge
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--disable-gpu")
-    driver = webdriver.Chrome(options=chrome_options)
-    driver.get(corecode_url)
-    # Vänta på att sidan laddats (justera vid behov)
-    time.sleep(3)
-    page_source = driver.page_source
-    driver.quit()
-    soup = BeautifulSoup(page_source, "html.parser")
-    table = soup.find("table")
-    if not table:
-        return []
-    headers = [th.get_text(strip=True) for th in table.find("tr").find_all("th")]
-    rows_data = []
-    for tr in table.find_all("tr")[1:]:
-        cells = [td.get_text(strip=True) for td in tr.find_all("td")]
-        if cells:
-            row_dict = dict(zip(headers, cells))
-            # För Corecode: "Startdatum", "Plats", "Handledare", "Platser kvar", "Pris"
-            startdatum = row_dict.get("Startdatum", "")
-            try:
-                dt = datetime.datetime.strptime(startdatum, "%Y-%m-%d")
-                datum_formatted = dt.strftime("%-d/%-m %y")
-                week_num = dt.isocalendar()[1]
-                vecka = f"📅 Vecka {week_num}"
-            except:
-                datum_formatted = startdatum
-                vecka = ""
-            plats = row_dict.get("Plats", "")
-            if ":" in plats:
-                left, right = plats.split(":", 1)
-                anlaggning = left.strip()
-                ort = right.strip()
-            else:
-                anlaggning = plats
-                ort = ""
-            handledare = row_dict.get("Handledare", "")
-            handledare = add_space_between_words(handledare)
-            platser = row_dict.get("Platser kvar", "")
-            try:
-                platser_int = int(platser)
-                platser_out = "Få" if platser_int == 0 else platser
-            except:
-                platser_out = platser
-            pris = row_dict.get("Pris", "")
-            rows_data.append({
-                "Vecka": vecka,
-                "Datum": datum_formatted,
-                "Anläggning": anlaggning,
-                "Ort": ort,
-                "Handledare": handledare,
-                "Pris": pris,
-                "Platser kvar": platser_out,
-                "Källa": "Corecode"
-            })
-    return rows_data
-
-corecode_list = fetch_corecode_data()
-corecode_df = pd.DataFrame(corecode_list)
+for provider_name, info in provider_status.items():
+    if info["status"] in ("timeout", "fel", "saknas"):
+        st.warning(f"Kunde inte hämta data från {provider_name} ({info['status']}). {info['meddelande']}")
 
 ####################################
 # 8) Kombinera data & Filtrering
 ####################################
-combined_df = pd.concat([ugl_df, rezon_df, corecode_df], ignore_index=True)
-
-week_filter_set = parse_week_filter(week_filter_input)
-price_filter_value = int(price_filter_input)
-def safe_week_int(v):
-    w = v.replace("📅 Vecka", "").strip()
-    return int(w) if w.isdigit() else None
-
-if week_filter_set:
-    combined_df["WeekInt"] = combined_df["Vecka"].apply(safe_week_int)
-    combined_df = combined_df.dropna(subset=["WeekInt"])
-    combined_df = combined_df[combined_df["WeekInt"].isin(week_filter_set)]
-if price_filter_value > 0:
-    combined_df["PriceInt"] = combined_df["Pris"].apply(extract_price)
-    combined_df = combined_df[combined_df["PriceInt"] <= (price_filter_value + 500)]
-def passes_restid(row):
-    # Kundens plats är user_location, kursens ort (utan prefix "📍")
-    course_ort = row["Ort"].replace("📍", "").strip().lower()
-    if course_ort == "eskilstuna":
-        travel_time = get_travel_time(user_location.strip(), course_ort, user_transport)
-        return travel_time <= user_restid
-    return True
-if user_location.strip() and user_restid > 0:
-    combined_df = combined_df[combined_df.apply(passes_restid, axis=1)]
-if not (week_filter_set or price_filter_value or (user_location.strip() and user_restid > 0)):
-    current_week = datetime.datetime.now().isocalendar()[1]
-    allowed_weeks = {current_week + 1, current_week + 2}
-    combined_df["WeekInt"] = combined_df["Vecka"].apply(safe_week_int)
-    combined_df = combined_df.dropna(subset=["WeekInt"])
-    combined_df = combined_df[combined_df["WeekInt"].isin(allowed_weeks)]
-
-filtered_df = combined_df.copy()
+# Sammanslagningen görs bara om när någon leverantör fått ny data
+combined_df = combine_frames(frames)
+
+criteria = {
+    "weeks": parse_week_filter(week_filter_input),
+    "max_price": int(price_filter_input),
+    "location": user_location,
+    "mode": user_transport,
+    "max_hours": user_restid,
+}
+with metrics.timer("filter"):
+    filtered_df = apply_filters(combined_df, criteria)
+
+week_span = weeks_date_span(criteria["weeks"])
+if week_span:
+    col_v.caption(f"{week_span[0]:%Y-%m-%d} – {week_span[1]:%Y-%m-%d}")
 
 ####################################
 # 9) Visa i 3 kolumner (kombinerad data)
 ####################################
 st.subheader("🔍 Välj kurser (Kombinerad)")
-courses = list(filtered_df.iterrows())
-selected_courses = []
-
-for i in range(0, len(courses), 3):
-    cols = st.columns(3)
-    for j, (idx, row) in enumerate(courses[i:i+3]):
-        with cols[j]:
-            st.markdown("---")
-            spots_html = format_spots(row["Platser kvar"])
-            block = f"""
-            <div style="margin-bottom: 1em;">
-              <span style="white-space: nowrap;">{row["Vecka"]} &nbsp; <strong>{row["Datum"]}</strong></span><br>
-              🏨 <strong>{row["Anläggning"]}</strong><br>
-              📍 <strong>{row["Ort"]}</strong><br>
-              💰 <strong>{row["Pris"]}</strong> &nbsp; {spots_html}<br>
-              👥 <strong>{row["Handledare"]}</strong><br>
-              {row["Källa"]}
-            </div>
-            """
-            st.markdown(block, unsafe_allow_html=True)
-            if st.checkbox("Välj denna kurs", key=f"val_{idx}"):
-                selected_courses.append(row)
-
-if selected_courses:
-    st.subheader("✅ Du har valt följande kurser:")
-    st.dataframe(pd.DataFrame(selected_courses), use_container_width=True)
+# Bara en sida kort ritas per körning, så kostnaden beror på sidstorleken
+PAGE_SIZE = 12
+
+# Valda kurser: mängd med kursnycklar. Nyckeln är stabil mellan skrapningar
+# (källa, startdatum, anläggning, ort), så valen överlever nya hämtningar, och
+# pris och platser slås alltid upp i den senaste datan (se selected_rows)
+if "selected_courses" not in st.session_state:
+    st.session_state.selected_courses = set()
+# Börja om från första sidan när filtren ändras
+filter_signature = repr(sorted((k, sorted(v) if isinstance(v, set) else v) for k, v in criteria.items()))
+if st.session_state.get("filter_signature") != filter_signature:
+    st.session_state.filter_signature = filter_signature
+    st.session_state.page = 0
+
+def resolve_selection(combined_df):
+    """
+    Valda nycklar -> ({nyckel i combined_df: valda nycklar}, nycklar som inte
+    längre finns). En kurs som slagits ihop med en annan källas rad hittas via
+    sin gamla nyckel (se merge.key_aliases). Valen sparas med den nyckel de
+    gjordes med, så att de överlever även om sammanslagningen ändras igen.
+    """
+    aliases = combined_aliases(combined_df)
+    resolved = {}
+    removed = []
+    for key in st.session_state.selected_courses:
+        current = key if key in combined_df.index else aliases.get(key)
+        if current is None:
+            removed.append(key)
+        else:
+            resolved.setdefault(current, []).append(key)
+    return resolved, sorted(removed)
+
+def selected_rows(combined_df):
+    """
+    Valda nycklar -> (visningsrader från den aktuella datan, nycklar som inte
+    längre finns). combined_df är indexerad på nyckel (se scrapers.combine_frames).
+    """
+    resolved, removed = resolve_selection(combined_df)
+    rows = combined_df.loc[list(resolved)].sort_values(["start", "kalla"]).to_dict("records")
+    return [course_card(row)[0] for row in rows], removed
+
+@st.fragment
+def results_grid(filtered_df, combined_df):
+    """
+    Kortvyn körs om för sig när man kryssar i en kurs eller byter sida;
+    sidopanel, hämtning och filtrering körs inte om.
+    """
+    render_start = time.perf_counter()
+    n_pages = max(1, -(-len(filtered_df) // PAGE_SIZE))
+    page = min(max(st.session_state.page, 0), n_pages - 1)
+    st.session_state.page = page
+    page_df = filtered_df.iloc[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]
+    courses = page_df.to_dict("records")
+    selection, _ = resolve_selection(combined_df)
+
+    for i in range(0, len(courses), 3):
+        cols = st.columns(3)
+        for j, row in enumerate(courses[i:i+3]):
+            with cols[j]:
+                st.markdown("---")
+                # Formatering för visning görs först här, en gång per kursinnehåll (se templates.py)
+                _, card_html = course_card(row)
+                st.markdown(card_html, unsafe_allow_html=True)
+                key = row["nyckel"]
+                st.checkbox(
+                    "Välj denna kurs",
+                    key=f"val_{key}",
+                    value=key in selection,
+                    on_change=toggle_course,
+                    args=(key, selection.get(key, ())),
+                )
+
+    if n_pages > 1:
+        col_prev, col_info, col_next = st.columns([1, 2, 1])
+        col_prev.button("◀ Föregående", on_click=change_page, args=(-1,), disabled=page == 0)
+        col_info.caption(
+            f"Sida {page + 1} av {n_pages} – visar {page * PAGE_SIZE + 1}–"
+            f"{page * PAGE_SIZE + len(page_df)} av {len(filtered_df)} kurser"
+        )
+        col_next.button("Nästa ▶", on_click=change_page, args=(1,), disabled=page >= n_pages - 1)
+
+    selected_courses, removed = selected_rows(combined_df)
+    if selected_courses or removed:
+        st.subheader("✅ Du har valt följande kurser:")
+    if selected_courses:
+        st.dataframe(pd.DataFrame(selected_courses), use_container_width=True)
+    if removed:
+        st.warning(
+            "Finns inte längre hos leverantören och skickas inte med: " + "; ".join(removed)
+        )
+        st.button("Ta bort dem ur valet", on_click=forget_courses, args=(removed,))
+    metrics.observe("render", time.perf_counter() - render_start)
+
+def toggle_course(key, selected_keys):
+    # Valen sparas i session_state så att de finns kvar när man byter sida.
+    # selected_keys: de valda nycklar (även gamla, se resolve_selection) som pekar på kursen
+    if st.session_state[f"val_{key}"]:
+        st.session_state.selected_courses.add(key)
+    else:
+        st.session_state.selected_courses.difference_update({key, *selected_keys})
+
+def forget_courses(keys):
+    st.session_state.selected_courses.difference_update(keys)
+
+def change_page(delta):
+    st.session_state.page += delta
+
+results_grid(filtered_df, combined_df)
 
 ####################################
 # 10) Visa fullständig kurslista
 ####################################
-if st.button("Visa Fullständig kurslista"):
-    st.subheader("📋 Fullständig kurslista")
-    st.dataframe(filtered_df, use_container_width=True)
+@st.fragment
+def full_list(filtered_df):
+    if st.button("Visa Fullständig kurslista"):
+        st.subheader("📋 Fullständig kurslista")
+        st.dataframe(display_frame(filtered_df), use_container_width=True)
+
+full_list(filtered_df)
 
 ####################################
 # 11) Skicka via mail med HTML (kombinerad data)
 ####################################
-st.subheader("Skicka information om dina valda kurser")
-if st.button("Skicka information via mail"):
-    if selected_courses and mail.strip():
-        req_id = st.session_state.random_id
-        st.session_state.random_id = generate_random_id()
-        table_html = f"""
-        Hej {namn},<br>
-        Namn: {namn} &nbsp;&nbsp; Telefon: {telefon}<br>
-        Mailadress: {mail}<br>
-        Förfrågan ID: {req_id}<br><br>
-        Här kommer dina valda kurser:<br><br>
-        <table border="1" style="border-collapse: collapse;">
-          <tr>
-            <th>Vecka & Pris</th>
-            <th>Datum</th>
-            <th>Anläggning</th>
-            <th>Ort</th>
-            <th>Källa</th>
-          </tr>
-        """
-        for course in selected_courses:
-            table_html += f"""
-          <tr>
-            <td>{course['Vecka']}<br>Pris: {course['Pris']}</td>
-            <td>{course['Datum']}</td>
-            <td>{course['Anläggning']}</td>
-            <td>{course['Ort']}</td>
-            <td>{course['Källa']}</td>
-          </tr>
-            """
-        table_html += """
-        </table>
-        <br>
-        Hälsningar,<br>
-        Ditt Företag
-        """
-        table_html_single = table_html.replace("\n", "").replace("\r", "")
-        subject = f"Valda kurser - Förfrågan ID: {req_id}"
-        mailto_link = (
-            f"mailto:{mail}"
-            f"?subject={urllib.parse.quote(subject)}"
-            f"&body={urllib.parse.quote(table_html_single)}"
-        )
-        st.markdown(
-            f"**Klicka [här]({mailto_link}) för att skicka ett mail med dina valda kurser.**<br>"
-            f"<em>OBS! Alla e-postklienter visar inte HTML korrekt.</em>",
-            unsafe_allow_html=True
-        )
-    else:
-        st.warning("Vänligen välj minst en kurs och ange din mailadress.")
+@st.fragment
+def mail_section(combined_df):
+    # Kontaktuppgifter och val läses ur session_state först när man trycker på knappen
+    namn = st.session_state.get("namn", "")
+    telefon = st.session_state.get("telefon", "")
+    mail = st.session_state.get("mail", "")
+    selected_courses, _ = selected_rows(combined_df)
+    st.subheader("Skicka information om dina valda kurser")
+    if st.button("Skicka information via mail"):
+        if selected_courses and mail.strip():
+            req_id = st.session_state.random_id
+            st.session_state.random_id = generate_random_id()
+            table_html = selection_mail(selected_courses, namn, telefon, mail, req_id)
+            table_html_single = table_html.replace("\n", "").replace("\r", "")
+            subject = f"Valda kurser - Förfrågan ID: {req_id}"
+            mailto_link = (
+                f"mailto:{mail}"
+                f"?subject={urllib.parse.quote(subject)}"
+                f"&body={urllib.parse.quote(table_html_single)}"
+            )
+            st.markdown(
+                f"**Klicka [här]({mailto_link}) för att skicka ett mail med dina valda kurser.**<br>"
+                f"<em>OBS! Alla e-postklienter visar inte HTML korrekt.</em>",
+                unsafe_allow_html=True
+            )
+        else:
+            st.warning("Vänligen välj minst en kurs och ange din mailadress.")
+
+mail_section(combined_df)
 
 ####################################
 # 12) Visa Corecode-data som lista (på samma ställe som övriga resultat)
 ####################################
 st.subheader("Corecode-data (skrapad)")
 if not corecode_df.empty:
-    st.dataframe(corecode_df, use_container_width=True)
+    st.dataframe(display_frame(corecode_df), use_container_width=True)
 else:
     st.write("Ingen Corecode-data hittades.")
+
+####################################
+# 13) Felsökning: tid per steg (UGL_DEBUG=1 eller ?debug=1)
+####################################
+if os.environ.get("UGL_DEBUG") == "1" or st.query_params.get("debug") == "1":
+    with st.sidebar.expander("Prestanda", expanded=True):
+        st.dataframe(pd.DataFrame(metrics.stage_rows()), use_container_width=True, hide_index=True)
+        values = [
+            {"Värde": name, "Leverantör": provider, "Senaste": value}
+            for (name, provider), value in sorted(metrics.values().items())
+        ]
+        if values:
+            st.dataframe(pd.DataFrame(values), use_container_width=True, hide_index=True)
+        st.caption("Tider i ms sedan appen startade. Rendering gäller den senaste körningen av kortvyn.")
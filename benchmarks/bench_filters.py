@@ -0,0 +1,100 @@
+"""
+Jämför filtreringen i app.py avsnitt 8: radvisa apply() på visningssträngar
+(tidigare sätt) mot filters.apply_filters() på numeriska kolumner.
+Det tidigare sättet kände bara till restider till Eskilstuna, så antalet
+träffar skiljer sig när restidsfiltret är aktivt.
+
+Kör från repots rot:  python -m benchmarks.bench_filters
+"""
+import datetime
+import random
+import re
+import time
+
+import courses
+import filters
+from benchmarks.synthetic_pages import VENUES
+
+CRITERIA = {
+    "weeks": {(2026, week) for week in range(10, 30)},
+    "max_price": 25000,
+    "location": "Stockholm",
+    "mode": "Bil",
+    "max_hours": 2,
+}
+
+
+def synthetic_frame(rows, seed=1):
+    rnd = random.Random(seed)
+    records = []
+    for i in range(rows):
+        start = datetime.date(2026, 1, 5) + datetime.timedelta(days=rnd.randint(0, 360))
+        venue, ort = rnd.choice(VENUES)
+        platser, status = courses.parse_seats(str(rnd.randint(0, 12)))
+        records.append(courses.make_course(
+            rnd.choice(["Uglkurser", "Rezon", "Corecode"]), start, start + datetime.timedelta(days=4),
+            venue, ort, "Anna Svensson", rnd.randint(18, 32) * 1000, platser, status,
+        ))
+    return courses.course_frame(records)
+
+
+####################################
+# Tidigare radvisa filtrering (kopierad från app.py före ändringen)
+####################################
+def old_filter(df, criteria):
+    def safe_week_int(v):
+        w = v.replace("📅 Vecka", "").strip()
+        return int(w) if w.isdigit() else None
+
+    def extract_price(price_str):
+        try:
+            return int(re.sub(r'\D', '', price_str))
+        except:
+            return 0
+
+    def get_travel_time(customer, course, mode):
+        times = {
+            "Bil": {"stockholm": {"eskilstuna": 1.5}},
+            "Kollektivt": {"stockholm": {"eskilstuna": 2.5}},
+        }
+        try:
+            return times[mode][customer.strip().lower()].get(course.strip().lower(), 99.0)
+        except:
+            return 99.0
+
+    def passes_restid(row):
+        course_ort = row["Ort"].replace("📍", "").strip().lower()
+        if course_ort == "eskilstuna":
+            return get_travel_time(criteria["location"], course_ort, criteria["mode"]) <= criteria["max_hours"]
+        return True
+
+    df = df.copy()
+    df["WeekInt"] = df["Vecka"].apply(safe_week_int)
+    df = df.dropna(subset=["WeekInt"])
+    df = df[df["WeekInt"].isin({week for _, week in criteria["weeks"]})]
+    df["PriceInt"] = df["Pris"].apply(extract_price)
+    df = df[df["PriceInt"] <= criteria["max_price"] + filters.PRICE_MARGIN]
+    return df[df.apply(passes_restid, axis=1)]
+
+
+def timed(func, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    print(f"{'Rader':>8}{'radvis ms':>12}{'vektor ms':>12}{'träffar':>10}{'nu':>10}")
+    for rows in (10_000, 30_000, 100_000):
+        df = synthetic_frame(rows)
+        display_df = courses.display_frame(df)
+        old_ms, old_result = timed(old_filter, display_df, CRITERIA)
+        new_ms, new_result = timed(filters.apply_filters, df, CRITERIA)
+        print(f"{rows:>8}{old_ms:>12.1f}{new_ms:>12.1f}{len(old_result):>10}{len(new_result):>10}")
+
+
+if __name__ == "__main__":
+    main()
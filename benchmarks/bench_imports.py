@@ -0,0 +1,73 @@
+"""
+Mäter importtiden för appens moduler, var för sig i en ny Python-process så
+att inget redan ligger i sys.modules. Kontrollerar också att tunga beroenden
+som bara behövs ibland (Selenium, BeautifulSoup, requests, smtplib) inte
+laddas förrän de används.
+
+Avslutas med felkod 1 om någon modul går över sin budget, så skriptet kan
+köras i CI.
+
+Kör från repots rot:  python -m benchmarks.bench_imports
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budget i millisekunder per modul (kall import, inklusive beroenden)
+IMPORT_BUDGET_MS = {
+    "courses": 600,
+    "filters": 700,
+    "scrapers": 900,
+    "email_utils": 600,
+    # Utkön får inte dra in skrapningen (requests, bs4)
+    "mail_queue": 600,
+    "scrape_worker": 1000,
+}
+
+# Får inte vara laddade direkt efter importen av modulen
+LAZY_MODULES = ["selenium", "bs4", "requests", "smtplib"]
+
+REPEAT = 3
+
+_PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+loaded = [m for m in {lazy!r} if m in sys.modules]
+print(elapsed, ",".join(loaded))
+"""
+
+
+def measure(module):
+    """-> (bästa tid i ms, tunga moduler som laddades) över REPEAT körningar."""
+    best, loaded = float("inf"), []
+    for _ in range(REPEAT):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, lazy=LAZY_MODULES)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.split()
+        best = min(best, float(out[0]))
+        loaded = out[1].split(",") if len(out) > 1 else []
+    return best, loaded
+
+
+def main():
+    failures = []
+    print(f"{'Modul':<16}{'ms':>8}{'budget':>8}  laddade i onödan")
+    for module, budget in IMPORT_BUDGET_MS.items():
+        ms, loaded = measure(module)
+        print(f"{module:<16}{ms:>8.0f}{budget:>8}  {', '.join(loaded) or '-'}")
+        if ms > budget:
+            failures.append(f"{module}: {ms:.0f} ms > {budget} ms")
+        if loaded:
+            failures.append(f"{module}: laddar {', '.join(loaded)} vid import")
+    for failure in failures:
+        print("FEL:", failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+"""
+Mäter merge.merge_courses() på syntetiska kurstabeller där ungefär var
+tredje kurs finns hos två källor. Tiden ska växa ungefär linjärt med antalet
+rader eftersom bara rader i samma block (startdatum, ort) jämförs.
+
+Kör från repots rot:  python -m benchmarks.bench_merge
+"""
+import pandas as pd
+
+from benchmarks.bench_filters import synthetic_frame, timed
+import courses
+import merge
+
+
+def with_duplicates(rows, seed=1):
+    df = synthetic_frame(rows, seed=seed)
+    copies = df.sample(frac=1 / 3, random_state=seed).copy()
+    copies["kalla"] = copies["kalla"].map({"Uglkurser": "Rezon", "Rezon": "Uglkurser", "Corecode": "Uglkurser"})
+    return courses.course_frame(pd.concat([df, copies], ignore_index=True))
+
+
+def main():
+    print(f"{'Rader':>8}{'ms':>10}{'µs/rad':>10}{'kvar':>10}")
+    for rows in (3_000, 10_000, 30_000):
+        df = with_duplicates(rows)
+        ms, merged = timed(merge.merge_courses, df)
+        print(f"{len(df):>8}{ms:>10.1f}{ms * 1000 / len(df):>10.1f}{len(merged):>10}")
+
+
+if __name__ == "__main__":
+    main()
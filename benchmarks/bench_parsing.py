@@ -0,0 +1,45 @@
+"""
+Jämför tabelltolkningen: hela dokumentet med html.parser (tidigare sätt)
+mot parsing.py (SoupStrainer + lxml). Mäter tid och maxminne per sida.
+
+Kör från repots rot:  python -m benchmarks.bench_parsing [antal rader]
+"""
+import sys
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+import parsing
+from benchmarks.synthetic_pages import PAGES
+
+
+def old_first_table(html):
+    soup = BeautifulSoup(html, "html.parser")
+    return soup.find("table")
+
+
+def measure(func, html, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(html)
+    elapsed_ms = (time.perf_counter() - start) * 1000 / repeat
+    tracemalloc.start()
+    func(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed_ms, peak / 1024
+
+
+def main(rows=200, repeat=10):
+    print(f"Parser: {parsing.PARSER}, {rows} rader per tabell, {repeat} varv")
+    print(f"{'Leverantör':<12}{'kB':>8}{'före ms':>10}{'efter ms':>10}{'före kB':>10}{'efter kB':>10}")
+    for name, make_page in PAGES.items():
+        html = make_page(rows=rows).encode("utf-8")
+        old_ms, old_kb = measure(old_first_table, html, repeat)
+        new_ms, new_kb = measure(parsing.first_table, html, repeat)
+        print(f"{name:<12}{len(html) / 1024:>8.0f}{old_ms:>10.1f}{new_ms:>10.1f}{old_kb:>10.0f}{new_kb:>10.0f}")
+
+
+if __name__ == "__main__":
+    main(rows=int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,85 @@
+"""
+Jämför rendering av kurskort (app.py avsnitt 9) och mail med valda kurser
+(avsnitt 11): f-strängar och += per körning (tidigare sätt) mot templates.py
+med förkompilerade mallar, escaping och cache per kursinnehåll. Omkörningarna
+simulerar att Streamlit ritar samma kort igen.
+
+Kör från repots rot:  python -m benchmarks.bench_render
+"""
+import time
+
+import courses
+import templates
+from benchmarks.bench_filters import synthetic_frame
+
+RERUNS = 5
+
+
+####################################
+# Tidigare sätt (kopierat från app.py före ändringen)
+####################################
+def old_card(row):
+    course = courses.display_row(row)
+    color = courses.seats_color(row["platser"], row["platser_status"])
+    text = courses.format_seats(row["platser"], row["platser_status"])
+    spots_html = f'<span style="color: {color}; font-weight: bold;">✅</span> {text}'
+    return course, f"""
+    <div style="margin-bottom: 1em;">
+      <span style="white-space: nowrap;">{course["Vecka"]} &nbsp; <strong>{course["Datum"]}</strong></span><br>
+      🏨 <strong>{course["Anläggning"]}</strong><br>
+      📍 <strong>{course["Ort"]}</strong><br>
+      💰 <strong>{course["Pris"]}</strong> &nbsp; {spots_html}<br>
+      👥 <strong>{course["Handledare"]}</strong><br>
+      {course["Källa"]}
+    </div>
+    """
+
+
+def old_mail(selected):
+    table_html = "<table>"
+    for course in selected:
+        table_html += f"""
+      <tr>
+        <td>{course['Vecka']}<br>Pris: {course['Pris']}</td>
+        <td>{course['Datum']}</td>
+        <td>{course['Anläggning']}</td>
+        <td>{course['Ort']}</td>
+        <td>{course['Källa']}</td>
+      </tr>
+        """
+    return table_html + "</table>"
+
+
+def run(func, items, reruns=1):
+    start = time.perf_counter()
+    for _ in range(reruns):
+        for item in items:
+            func(item)
+    return (time.perf_counter() - start) * 1000 / reruns
+
+
+def new_mail(selected):
+    return templates.selection_mail(selected, "Kim", "", "kim@example.se", "ABC123")
+
+
+def main():
+    print("ms per körning; 'kall' är första renderingen, 'varm' en omkörning med samma kurser")
+    print(f"{'Antal':>8}{'kort före':>12}{'kall':>8}{'varm':>8}{'mail före':>12}{'kall':>8}{'varm':>8}")
+    for n in (100, 1000, 5000):
+        rows = synthetic_frame(n * 2).head(n).to_dict("records")
+        templates._course_card.cache_clear()
+        templates._selection_row.cache_clear()
+        templates._selection_rows.cache_clear()
+        templates._escape_text.cache_clear()
+        old_ms = run(old_card, rows, RERUNS)
+        cold_ms = run(templates.course_card, rows)
+        warm_ms = run(templates.course_card, rows, RERUNS)
+        selected = [templates.course_card(row)[0] for row in rows]
+        old_mail_ms = run(old_mail, [selected], RERUNS)
+        cold_mail_ms = run(new_mail, [selected])
+        warm_mail_ms = run(new_mail, [selected], RERUNS)
+        print(f"{n:>8}{old_ms:>12.1f}{cold_ms:>8.1f}{warm_ms:>8.1f}{old_mail_ms:>12.1f}{cold_mail_ms:>8.1f}{warm_mail_ms:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Offline-benchmark för skrapning och filtrering, utan nätverk:
+
+- tabellgenomgången för uglkurser.se (ugl_rows)
+- radtolkningen per leverantör (process_ugl_row, process_rezon_row, process_corecode_row)
+- filtreringen i app.py avsnitt 8 (filters.apply_filters)
+
+Först kontrolleras fixturerna (se make_fixtures.py). Den syntetiska korpusen
+i benchmarks/fixtures ska ge exakt FIXTURE_ROWS kurser per leverantör. En
+inspelad korpus med leverantörernas riktiga sidor (benchmarks/recorded) ska
+ge minst en kurs per leverantör med startdatum och pris, om den finns. Ett
+fel här ger alltid felkod 1.
+
+Sedan mäts varje steg på uppskalade syntetiska sidor. Tiden per rad anges
+relativt en referens som mäts i samma körning: den tidigare radvisa
+filtreringen (bench_filters.old_filter). Baslinjen i benchmarks/baseline.json
+gäller därför oberoende av hur snabb maskinen är. Ett steg som är mer än
+TOLERANCE gånger långsammare än baslinjen skrivs ut som en varning. Med
+--check ger det också felkod 1, t.ex. i CI på en maskin med jämn prestanda.
+
+Kör från repots rot:  python -m benchmarks.bench_scrape [--check] [--save]
+  --check  felkod 1 även vid prestandaregression
+  --save   skriv dagens mätning som ny baslinje
+"""
+import json
+import os
+import sys
+
+import courses
+import filters
+import scrapers
+from benchmarks.bench_filters import CRITERIA, old_filter, timed
+from benchmarks.make_fixtures import FIXTURE_DIR, FIXTURE_ROWS, RECORDED_DIR
+from benchmarks.synthetic_pages import PAGES
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# Så här många gånger långsammare än baslinjen räknas som en regression
+TOLERANCE = 2.0
+ROWS = 5000
+# Bästa tiden av så här många körningar per steg; korta steg (filtrering) varierar mest
+REPEAT = 7
+
+
+def check_fixtures(directory=FIXTURE_DIR, expected_rows=FIXTURE_ROWS):
+    """
+    -> lista med fel för sidorna i directory. expected_rows=None (inspelade
+    sidor) kräver bara minst en kurs per leverantör.
+    """
+    errors = []
+    for name, provider in scrapers.PROVIDERS.items():
+        path = provider.fixture_path(directory)
+        if not os.path.exists(path):
+            errors.append(f"{name}: {path} saknas")
+            continue
+        with open(path, "rb") as f:
+            records = provider.parse(f.read())
+        if records is None:
+            errors.append(f"{name}: kurstabellen saknas i {path}")
+        elif expected_rows is not None and len(records) != expected_rows:
+            errors.append(f"{name}: {len(records)} kurser i {path}, väntade {expected_rows}")
+        elif not records:
+            errors.append(f"{name}: inga kurser i {path}")
+        elif any(r["start"] is None or r["pris_kr"] is None for r in records):
+            errors.append(f"{name}: kurser utan startdatum eller pris i {path}")
+    return errors
+
+
+def stages(rows=ROWS):
+    """-> {steg: (funktion, argument, antal rader)} på uppskalade sidor."""
+    pages = {name: make_page(rows=rows).encode("utf-8") for name, make_page in PAGES.items()}
+    raw = {name: provider.rows(pages[name]) for name, provider in scrapers.PROVIDERS.items()}
+    combined = scrapers.combine_frames({
+        name: courses.course_frame(provider.parse(pages[name])) for name, provider in scrapers.PROVIDERS.items()
+    })
+
+    def process(func, rows):
+        return [func(row) for row in rows]
+
+    return {
+        "referens": (old_filter, (courses.display_frame(combined), CRITERIA), len(combined)),
+        "ugl_tabell": (scrapers.ugl_rows, (pages["Uglkurser"],), rows),
+        "ugl_rader": (process, (scrapers.process_ugl_row, raw["Uglkurser"]), rows),
+        "rezon_rader": (process, (scrapers.process_rezon_row, raw["Rezon"]), rows),
+        "corecode_rader": (process, (scrapers.process_corecode_row, raw["Corecode"]), rows),
+        "filtrering": (filters.apply_filters, (combined, CRITERIA), len(combined)),
+    }
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    errors = check_fixtures()
+    if os.path.isdir(RECORDED_DIR):
+        errors += check_fixtures(RECORDED_DIR, expected_rows=None)
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    reference = None
+    print(f"{'Steg':<16}{'rader':>8}{'ms':>10}{'µs/rad':>10}{'relativt':>10}{'baslinje':>10}")
+    for name, (func, args, n) in stages().items():
+        ms, _ = timed(func, *args, repeat=REPEAT)
+        per_row = ms * 1000 / max(n, 1)
+        if reference is None:
+            # Första steget är referensen som de andra jämförs med
+            reference = per_row
+            print(f"{name:<16}{n:>8}{ms:>10.1f}{per_row:>10.2f}{1:>10.3f}{'-':>10}")
+            continue
+        relative = round(per_row / reference, 3)
+        results[name] = relative
+        base = baseline.get(name)
+        print(f"{name:<16}{n:>8}{ms:>10.1f}{per_row:>10.2f}{relative:>10.3f}{base if base is not None else '-':>10}")
+        if base is not None and relative > base * TOLERANCE:
+            regressions.append(f"{name}: {relative} gånger referensen, baslinjen är {base}")
+
+    if "--save" in argv:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Ny baslinje sparad i {BASELINE_PATH}")
+        return 0
+    for error in errors:
+        print("FEL:", error)
+    for regression in regressions:
+        print("FEL:" if "--check" in argv else "VARNING:", regression)
+    if "--check" in argv:
+        errors += regressions
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+Jämför hur lång tid det tar för en ny appinstans att få fram leverantörernas
+DataFrames: från databasen (UGL_SCRAPE_MODE=extern) eller från en
+ögonblicksbild i Arrow- eller Parquet-format (UGL_SCRAPE_MODE=snapshot).
+Visar också filstorlek och minnesanvändning för de inlästa tabellerna.
+
+Kör från repots rot:  python -m benchmarks.bench_snapshot
+"""
+import datetime
+import os
+import tempfile
+
+from benchmarks.bench_filters import synthetic_frame, timed
+import courses
+
+
+class _Hamtning:
+    def __init__(self):
+        self.senast_ok = self.senast_andrad = datetime.datetime.now()
+
+
+def file_bytes(path):
+    # Med WAL ligger det mesta i -wal-filen tills den checkpointas
+    return sum(os.path.getsize(p) for p in (path, f"{path}-wal") if os.path.exists(p))
+
+
+def frame_bytes(frames):
+    return sum(int(frame.memory_usage(deep=True).sum()) for frame in frames.values())
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    # store läser UGL_DB_PATH vid import
+    os.environ["UGL_DB_PATH"] = os.path.join(directory, "kurser.db")
+    import snapshot
+    import store
+
+    df = courses.course_frame(synthetic_frame(30_000))
+    frames = {name: df[df["kalla"] == name].reset_index(drop=True) for name in snapshot.scrapers.PROVIDERS}
+    for name, frame in frames.items():
+        store.save_provider_frame(name, frame)
+    table = snapshot.to_table(frames, {name: _Hamtning() for name in frames})
+
+    print(f"{len(df)} kurser")
+    print(f"{'Källa':<10}{'ms':>10}{'kB fil':>10}{'kB minne':>10}")
+    ms, loaded = timed(lambda: {name: store.load_provider(name)[0] for name in frames})
+    print(f"{'databas':<10}{ms:>10.1f}{file_bytes(store.DB_PATH) / 1024:>10.0f}{frame_bytes(loaded) / 1024:>10.0f}")
+    for ext in ("arrow", "parquet"):
+        path = os.path.join(directory, f"kurser.{ext}")
+        snapshot.write_table(table, path)
+        ms, loaded = timed(lambda: snapshot.to_frames(snapshot.read_table(path)))
+        print(f"{ext:<10}{ms:>10.1f}{file_bytes(path) / 1024:>10.0f}{frame_bytes(loaded) / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Mikrobenchmark för cellnormaliseringen: hjälpfunktionerna som de såg ut i
+scrapers.py och courses.py (re.sub/re.findall med mönster som text och en
+split_handledare som definierades om för varje rad) mot textnorm.py med
+förkompilerade mönster och cache per unik celltext. Cellerna kommer från
+uppskalade syntetiska sidor. Cacharna töms före varje mätning, så siffrorna
+gäller en skrapning där ingen cell setts förut.
+
+Kör från repots rot:  python -m benchmarks.bench_textnorm [antal rader]
+"""
+import re
+import sys
+import time
+
+import scrapers
+import textnorm
+from benchmarks.synthetic_pages import PAGES
+
+
+####################################
+# Tidigare hjälpfunktioner (kopierade från scrapers.py och courses.py)
+####################################
+def old_add_space_between_words(text):
+    return re.sub(r'(?<=[a-zåäö])(?=[A-ZÅÄÖ])', ' ', text)
+
+
+def old_combine_handledare(h1, h2):
+    if h1 and h2:
+        return f"{h1} {h2}"
+    else:
+        return h1 or h2
+
+
+def old_rezon_names(handledare):
+    def split_handledare(text):
+        m = re.findall(r'[A-ZÅÄÖ][^A-ZÅÄÖ]+', text)
+        if len(m) >= 2:
+            return m[0].strip(), m[1].strip()
+        else:
+            sp = text.split()
+            if len(sp) >= 2:
+                return sp[0], " ".join(sp[1:])
+            else:
+                return text, ""
+    h1, h2 = split_handledare(old_add_space_between_words(handledare))
+    return old_combine_handledare(h1, h2)
+
+
+def old_rezon_price(pris_text):
+    prices = re.findall(r'(\d[\d\s]*)\s*kr', pris_text)
+    total_price = None
+    for p in prices:
+        try:
+            total_price = (total_price or 0) + int(p.replace(" ", ""))
+        except:
+            pass
+    return total_price
+
+
+def old_parse_price(text):
+    digits = re.sub(r"\D", "", text or "")
+    return int(digits) if digits else None
+
+
+def new_rezon_names(handledare):
+    return textnorm.join_names(*textnorm.split_names(handledare))
+
+
+def clear_caches():
+    for func in (textnorm.split_words, textnorm.split_names, textnorm.to_int, textnorm.sum_prices):
+        func.cache_clear()
+
+
+def measure(func, cells, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        clear_caches()
+        start = time.perf_counter()
+        for cell in cells:
+            func(cell)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6 / max(len(cells), 1)
+
+
+def main(rows=5000):
+    rezon = scrapers.REZON.rows(PAGES["Rezon"](rows=rows).encode("utf-8"))
+    corecode = scrapers.CORECODE.rows(PAGES["Corecode"](rows=rows).encode("utf-8"))
+    ugl = scrapers.ugl_rows(PAGES["Uglkurser"](rows=rows).encode("utf-8"))
+    cases = [
+        ("Rezon handledare", old_rezon_names, new_rezon_names, [r["Handledare"] for r in rezon]),
+        ("Rezon pris", old_rezon_price, textnorm.sum_prices, [r["Pris"] for r in rezon]),
+        ("Rezon ort", old_add_space_between_words, textnorm.split_words, [r["Utbildningsort"] for r in rezon]),
+        ("Corecode handledare", old_add_space_between_words, textnorm.split_words, [r["Handledare"] for r in corecode]),
+        ("Corecode pris", old_parse_price, textnorm.to_int, [r["Pris"] for r in corecode]),
+        ("Uglkurser pris", old_parse_price, textnorm.to_int, [r[3][0] for r in ugl]),
+    ]
+    print(f"{rows} rader per sida, µs per cell")
+    print(f"{'Cell':<22}{'före':>8}{'efter':>8}{'faktor':>8}")
+    for name, old, new, cells in cases:
+        assert [old(c) for c in cells] == [new(c) for c in cells], name
+        old_us, new_us = measure(old, cells), measure(new, cells)
+        print(f"{name:<22}{old_us:>8.2f}{new_us:>8.2f}{old_us / new_us:>8.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,73 @@
+"""
+Fixturkorpusar för att köra appen, skrapan och benchmarks utan nätverk. En
+korpus är en katalog med en sida per leverantör (<namn>.html), se
+providers.Provider.fixture_path.
+
+- benchmarks/fixtures är SYNTETISK: sidorna genereras av
+  benchmarks/synthetic_pages.py och har samma tabellstruktur som
+  leverantörernas sidor hade när tolkningen skrevs. Den fångar ändringar i
+  vår egen tolkning, men inte att leverantörerna ändrar sina sidor.
+- Med --record sparas leverantörernas riktiga sidor (via den delade
+  HTTP-klienten) i en egen katalog, som standard benchmarks/recorded.
+  bench_scrape.py kontrollerar den korpusen också när den finns.
+
+    UGL_FIXTURE_DIR=benchmarks/fixtures streamlit run app.py
+
+Kör från repots rot:
+    python -m benchmarks.make_fixtures [antal rader] [katalog]
+    python -m benchmarks.make_fixtures --record [katalog]
+"""
+import os
+import sys
+
+from benchmarks.synthetic_pages import PAGES
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(BENCHMARK_DIR, "fixtures")
+RECORDED_DIR = os.path.join(BENCHMARK_DIR, "recorded")
+FIXTURE_ROWS = 60
+FIXTURE_NOISE = 40
+
+
+def write_fixtures(directory=FIXTURE_DIR, rows=FIXTURE_ROWS, noise=FIXTURE_NOISE):
+    """Skriver en syntetisk sida per leverantör och returnerar {namn: sökväg}."""
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for name, make_page in PAGES.items():
+        path = os.path.join(directory, f"{name}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(make_page(rows=rows, noise=noise))
+        paths[name] = path
+    return paths
+
+
+def record_pages(directory=RECORDED_DIR):
+    """
+    Hämtar varje leverantörs riktiga sida och sparar den oförändrad. Sidor
+    som renderas med JavaScript (Corecode utan tabell i HTML-svaret) sparas
+    som de ser ut för en vanlig HTTP-hämtning. Returnerar {namn: sökväg}.
+    """
+    from http_client import http_client
+    import scrapers
+
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for name, provider in scrapers.PROVIDERS.items():
+        resp = http_client.get(provider.url)
+        resp.raise_for_status()
+        path = provider.fixture_path(directory)
+        with open(path, "wb") as f:
+            f.write(resp.content)
+        paths[name] = path
+    return paths
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args[:1] == ["--record"]:
+        paths = record_pages(args[1] if len(args) > 1 else RECORDED_DIR)
+    else:
+        rows = int(args[0]) if args else FIXTURE_ROWS
+        paths = write_fixtures(args[1] if len(args) > 1 else FIXTURE_DIR, rows)
+    for name, path in paths.items():
+        print(f"{name:<12}{os.path.getsize(path) / 1024:>8.0f} kB  {path}")
@@ -0,0 +1,112 @@
+"""
+Syntetiska leverantörssidor för benchmarks. Tabellerna följer samma struktur
+som uglkurser.se, rezon.se och corecode.se, omgivna av sidinnehåll (meny,
+skript, brödtext) så att skillnaden mellan att tolka hela sidan och bara
+tabellen syns.
+"""
+import datetime
+import random
+
+FIRST_NAMES = ["Anna", "Per", "Karin", "Lars", "Eva", "Johan", "Maria", "Erik"]
+LAST_NAMES = ["Svensson", "Olsson", "Lindqvist", "Åberg", "Öberg", "Nilsson"]
+VENUES = [
+    ("Sundbyholms Slott", "Eskilstuna"),
+    ("Gällöfsta", "Kungsängen"),
+    ("Hotell Frimurarhotellet", "Linköping"),
+    ("Kosta Boda Art Hotel", "Kosta"),
+    ("Tylebäck", "Eskilstuna"),
+    ("Säby Gård", "Stockholm"),
+]
+
+
+def _course_dates(i, start=datetime.date(2026, 1, 5)):
+    first = start + datetime.timedelta(weeks=i % 100)
+    return first, first + datetime.timedelta(days=4)
+
+
+def _name(rnd):
+    return f"{rnd.choice(FIRST_NAMES)}{rnd.choice(LAST_NAMES)}"
+
+
+def _page(table_html, noise):
+    nav = "".join(f'<li><a href="/sida{i}">Länk {i}</a></li>' for i in range(noise))
+    text = "".join(f"<p>Stycke {i} med <b>lite</b> text om UGL-utbildningar.</p>" for i in range(noise))
+    script = "<script>var data = {};" + "x=1;" * noise + "</script>"
+    return (
+        f"<html><head><title>UGL</title>{script}</head><body>"
+        f"<nav><ul>{nav}</ul></nav><main>{text}{table_html}</main>"
+        f"<footer>{text}</footer></body></html>"
+    )
+
+
+def ugl_page(rows=50, noise=200, seed=1):
+    rnd = random.Random(seed)
+    body = []
+    for i in range(rows):
+        first, last = _course_dates(i)
+        venue, ort = rnd.choice(VENUES)
+        body.append(
+            "<tr>"
+            f"<td>{first} - {last}<br>Vecka {first.isocalendar()[1]}</td>"
+            f"<td>{venue}, {ort}<br>Platser kvar: {rnd.randint(0, 12)}</td>"
+            f"<td>{_name(rnd)}<br>{_name(rnd)}</td>"
+            f"<td>{rnd.randint(20, 30)} {rnd.choice(['000', '500', '900'])} kr<br>exkl. moms</td>"
+            "</tr>"
+        )
+    table = (
+        "<table><tr><th>Kursdatum</th><th>Kursplats</th><th>Kursledare</th><th>Pris</th></tr>"
+        + "".join(body) + "</table>"
+    )
+    return _page(table, noise)
+
+
+def rezon_page(rows=50, noise=200, seed=2):
+    rnd = random.Random(seed)
+    body = []
+    for i in range(rows):
+        first, last = _course_dates(i)
+        venue, ort = rnd.choice(VENUES)
+        booking = "Fullbokad" if rnd.random() < 0.2 else "Boka"
+        body.append(
+            "<tr>"
+            f"<td>{first} - {last} <span>Vecka {first.isocalendar()[1]}</span></td>"
+            f"<td>{venue.replace(' ', '')}{ort}</td>"
+            f"<td>{_name(rnd)}{_name(rnd)}</td>"
+            f"<td>{rnd.randint(20, 30)} 500 kr + 3 900 kr</td>"
+            f"<td>{booking}</td>"
+            "</tr>"
+        )
+    table = (
+        "<table><tr><th>Kursdatum</th><th>Utbildningsort</th><th>Handledare</th>"
+        "<th>Pris</th><th>Bokningsdetaljer</th></tr>" + "".join(body) + "</table>"
+    )
+    return _page(table, noise)
+
+
+def corecode_page(rows=50, noise=200, seed=3):
+    rnd = random.Random(seed)
+    body = []
+    for i in range(rows):
+        first, _ = _course_dates(i)
+        venue, ort = rnd.choice(VENUES)
+        body.append(
+            "<tr>"
+            f"<td>{first}</td>"
+            f"<td>{venue}: {ort}</td>"
+            f"<td>{_name(rnd)}</td>"
+            f"<td>{rnd.randint(0, 10)}</td>"
+            f"<td>{rnd.randint(20, 30)} 900 kr</td>"
+            "</tr>"
+        )
+    table = (
+        "<table><tr><th>Startdatum</th><th>Plats</th><th>Handledare</th>"
+        "<th>Platser kvar</th><th>Pris</th></tr>" + "".join(body) + "</table>"
+    )
+    return _page(table, noise)
+
+
+PAGES = {
+    "Uglkurser": ugl_page,
+    "Rezon": rezon_page,
+    "Corecode": corecode_page,
+}
@@ -0,0 +1,106 @@
+import atexit
+import queue
+import threading
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+# Max antal samtidiga Chrome-instanser i processen
+POOL_SIZE = 2
+# Starta om en instans efter så här många sidladdningar (motverkar minnesläckor)
+MAX_PAGES_PER_BROWSER = 50
+# Hur länge (sekunder) vi väntar på en ledig instans
+ACQUIRE_TIMEOUT = 60
+
+
+def create_driver():
+    # Ställ in Chrome i headless-läge
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    return webdriver.Chrome(options=chrome_options)
+
+
+class PooledBrowser:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+    def is_healthy(self):
+        try:
+            return self.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+
+class BrowserPool:
+    """
+    Begränsad pool av långlivade headless-webbläsare som delas av alla sessioner.
+    Instanser skapas först när de behövs, hälsokontrolleras innan de lämnas ut
+    och byts ut efter max_pages sidladdningar.
+    """
+
+    def __init__(self, size=POOL_SIZE, max_pages=MAX_PAGES_PER_BROWSER, driver_factory=create_driver):
+        self.max_pages = max_pages
+        self._driver_factory = driver_factory
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _take_idle(self):
+        while True:
+            try:
+                browser = self._idle.get_nowait()
+            except queue.Empty:
+                return PooledBrowser(self._driver_factory())
+            if browser.is_healthy():
+                return browser
+            browser.quit()
+
+    @contextmanager
+    def driver(self, timeout=ACQUIRE_TIMEOUT):
+        """Lånar en webbläsare: `with browser_pool.driver() as driver: ...`"""
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("Ingen ledig webbläsare i poolen")
+        browser = None
+        try:
+            browser = self._take_idle()
+            yield browser.driver
+            browser.pages += 1
+        except Exception:
+            # Instansen kan vara i okänt läge efter ett fel, släng den
+            if browser is not None:
+                browser.quit()
+                browser = None
+            raise
+        finally:
+            if browser is not None:
+                with self._lock:
+                    closed = self._closed
+                if closed or browser.pages >= self.max_pages:
+                    browser.quit()
+                else:
+                    self._idle.put(browser)
+            self._slots.release()
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().quit()
+            except queue.Empty:
+                break
+
+
+browser_pool = BrowserPool()
+atexit.register(browser_pool.shutdown)
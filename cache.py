@@ -0,0 +1,32 @@
+import threading
+import time
+
+
+class CacheEntry:
+    def __init__(self, value, stored_at):
+        self.value = value
+        self.stored_at = stored_at
+
+    def age(self):
+        return time.time() - self.stored_at
+
+
+class TTLCache:
+    """
+    Enkel trådsäker cache som delas av alla sessioner i processen.
+    Själva TTL-kontrollen görs av anroparen så att inaktuella värden
+    kan lämnas ut medan de uppdateras i bakgrunden (stale-while-revalidate).
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key, value, stored_at=None):
+        with self._lock:
+            self._entries[key] = CacheEntry(value, time.time() if stored_at is None else stored_at)
+
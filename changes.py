@@ -0,0 +1,45 @@
+import hashlib
+
+# Fält som ingår i innehållshashen, dvs. allt som kan ändras för en och samma kurs
+HASHED_FIELDS = ["slut", "platser_antal", "platser_status", "pris_kr", "handledare", "hemsida"]
+
+
+def course_keys(df):
+    """
+    Stabil nyckel per kurs i en kanonisk DataFrame: källa|startdatum|anläggning|ort.
+    En källa kan ha flera kurser med samma startdatum, anläggning och ort (eller
+    kurser utan datum); de numreras i den ordning källan listar dem och den
+    första behåller nyckeln utan nummer: 'nyckel', 'nyckel#2', 'nyckel#3'.
+    """
+    start = df["start"].dt.strftime("%Y-%m-%d").fillna("")
+    keys = (df["kalla"] + "|" + start + "|" + df["anlaggning"] + "|" + df["ort"]).str.lower()
+    seq = keys.groupby(keys, sort=False).cumcount()
+    return keys.where(seq == 0, keys + "#" + (seq + 1).astype(str))
+
+
+def content_hash(values):
+    text = "\x1f".join(str(values.get(field) or "") for field in HASHED_FIELDS)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class ChangeSet:
+    """Nycklar som lagts till, ändrats eller försvunnit sedan förra hämtningen."""
+
+    def __init__(self, inserted=(), updated=(), removed=()):
+        self.inserted = list(inserted)
+        self.updated = list(updated)
+        self.removed = list(removed)
+
+    def __bool__(self):
+        return bool(self.inserted or self.updated or self.removed)
+
+    def summary(self):
+        return f"{len(self.inserted)} nya, {len(self.updated)} ändrade, {len(self.removed)} borttagna"
+
+
+def diff(old_hashes, new_hashes):
+    """Jämför {nyckel: hash} från förra och nya hämtningen."""
+    inserted = [key for key in new_hashes if key not in old_hashes]
+    updated = [key for key, h in new_hashes.items() if key in old_hashes and old_hashes[key] != h]
+    removed = [key for key in old_hashes if key not in new_hashes]
+    return ChangeSet(inserted, updated, removed)
@@ -0,0 +1,146 @@
+"""
+Kanonisk kurspost. Leverantörernas tabeller tolkas en gång vid skrapning till
+typade fält (datum, vecka, pris i kronor, antal platser); formatering för
+visning görs först när något ska visas.
+"""
+import pandas as pd
+
+from changes import course_keys
+from dates import iso_week
+from textnorm import to_int
+
+COURSE_COLUMNS = [
+    "kalla", "start", "slut", "ar", "vecka", "anlaggning", "ort",
+    "handledare", "pris_kr", "platser", "platser_status",
+]
+
+# Kolumnerna som visas i tabeller i appen
+DISPLAY_COLUMNS = ["Vecka", "Datum", "Anläggning", "Ort", "Handledare", "Pris", "Platser kvar", "Källa"]
+
+# Värden för platser_status
+LEDIG = "ledig"
+FA = "få"
+FULLBOKAD = "fullbokad"
+OKAND = "okänd"
+
+
+####################################
+# Tolkning (vid skrapning)
+####################################
+def parse_price(text):
+    """'24 900 kr' -> 24900, None om inget belopp finns."""
+    return to_int(text)
+
+
+def parse_seats(text):
+    """Fritext om platser -> (antal eller None, status)."""
+    text = (text or "").strip()
+    lower = text.lower()
+    if "fullbokad" in lower:
+        return 0, FULLBOKAD
+    if "få" in lower:
+        return None, FA
+    antal = to_int(text)
+    if antal is not None:
+        return antal, LEDIG if antal >= 3 else FA
+    return None, LEDIG if text else OKAND
+
+
+def parse_week(text):
+    return to_int(text)
+
+
+def make_course(kalla, start, slut, anlaggning, ort, handledare, pris_kr, platser, platser_status, vecka=None):
+    """Bygger en kanonisk kurspost. Vecka och år räknas från startdatum när det finns."""
+    ar = None
+    if start is not None:
+        ar, vecka = iso_week(start)
+    return {
+        "kalla": kalla,
+        "start": start,
+        "slut": slut,
+        "ar": ar,
+        "vecka": vecka,
+        "anlaggning": anlaggning,
+        "ort": ort,
+        "handledare": handledare,
+        "pris_kr": pris_kr,
+        "platser": platser,
+        "platser_status": platser_status,
+    }
+
+
+def course_frame(records):
+    """Lista med kursposter (eller DataFrame) -> DataFrame med COURSE_COLUMNS, numeriska typer och nyckel."""
+    df = records if isinstance(records, pd.DataFrame) else pd.DataFrame(list(records), columns=COURSE_COLUMNS)
+    df = df.reindex(columns=COURSE_COLUMNS)
+    df["start"] = pd.to_datetime(df["start"])
+    df["slut"] = pd.to_datetime(df["slut"])
+    for column in ("ar", "vecka", "pris_kr", "platser"):
+        df[column] = pd.to_numeric(df[column]).astype("Int64")
+    for column in ("kalla", "anlaggning", "ort", "handledare", "platser_status"):
+        df[column] = df[column].fillna("").astype(str)
+    # Stabil identitet per kurs (se changes.course_keys), unik inom tabellen
+    df["nyckel"] = course_keys(df)
+    return df
+
+
+####################################
+# Formatering (vid visning)
+####################################
+def format_week(vecka):
+    return f"📅 Vecka {vecka}" if not pd.isna(vecka) else ""
+
+
+def format_dates(start, slut):
+    """-> 'D/M - D/M YY' eller 'D/M YY'."""
+    if pd.isna(start):
+        return ""
+    if pd.isna(slut):
+        return f"{start.day}/{start.month} {start.year % 100:02d}"
+    return f"{start.day}/{start.month} - {slut.day}/{slut.month} {start.year % 100:02d}"
+
+
+def format_price(pris_kr):
+    if pd.isna(pris_kr):
+        return ""
+    return f"{int(pris_kr):,} kr".replace(",", " ")
+
+
+def format_seats(platser, status):
+    if status == FULLBOKAD:
+        return "Fullbokad"
+    if not pd.isna(platser):
+        return "Få" if platser == 0 else str(int(platser))
+    if status == FA:
+        return "Få"
+    if status == LEDIG:
+        return "Lediga platser"
+    return ""
+
+
+def seats_color(platser, status):
+    if status == FULLBOKAD:
+        return "red"
+    if status == FA:
+        return "orange"
+    return "green"
+
+
+def display_row(row):
+    return {
+        "Vecka": format_week(row["vecka"]),
+        "Datum": format_dates(row["start"], row["slut"]),
+        "Anläggning": row["anlaggning"],
+        "Ort": row["ort"],
+        "Handledare": row["handledare"],
+        "Pris": format_price(row["pris_kr"]),
+        "Platser kvar": format_seats(row["platser"], row["platser_status"]),
+        # Efter sammanslagning (merge.py) listas alla källor som har kursen
+        "Källa": row.get("kallor") or row["kalla"],
+    }
+
+
+def display_frame(df):
+    """Kanonisk DataFrame -> DataFrame med DISPLAY_COLUMNS för st.dataframe."""
+    return pd.DataFrame([display_row(row) for row in df.to_dict("records")], columns=DISPLAY_COLUMNS)
@@ -0,0 +1,102 @@
+"""
+Datum och ISO-veckor. Leverantörerna upprepar samma datum på många rader,
+så tolkningen cachas per unik sträng och veckan per unikt datum. Vecka ->
+datumintervall slås upp i tabeller som räknas fram en gång per år.
+
+Veckonummer utan år (t.ex. från veckofiltret i appen) tolkas som nästa
+gång veckan inträffar, så 'vecka 1-2' i december betyder början av nästa år.
+"""
+import datetime
+import functools
+
+CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def parse_iso_date(text):
+    try:
+        return datetime.date.fromisoformat(text.strip())
+    except (AttributeError, ValueError):
+        return None
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def parse_date_range(text):
+    """'YYYY-MM-DD - YYYY-MM-DD' -> (start, slut). Enstaka datum ger slut=None."""
+    parts = (text or "").split(" - ")
+    start = parse_iso_date(parts[0])
+    slut = parse_iso_date(parts[1]) if len(parts) == 2 else None
+    return start, slut
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def iso_week(date):
+    """datum -> (ISO-år, vecka)."""
+    year, week, _ = date.isocalendar()
+    return year, week
+
+
+@functools.lru_cache(maxsize=16)
+def week_table(year):
+    """{vecka: (måndag, söndag)} för alla ISO-veckor i year (52 eller 53 st)."""
+    monday = datetime.date.fromisocalendar(year, 1, 1)
+    table = {}
+    while iso_week(monday)[0] == year:
+        table[iso_week(monday)[1]] = (monday, monday + datetime.timedelta(days=6))
+        monday += datetime.timedelta(weeks=1)
+    return table
+
+
+def weeks_in_year(year):
+    return len(week_table(year))
+
+
+def week_range(year, week):
+    """(måndag, söndag) för veckan, None om året inte har den veckan."""
+    return week_table(year).get(week)
+
+
+def next_occurrence(week, today=None):
+    """Veckonummer -> (år, vecka) nästa gång veckan inträffar, från och med denna vecka."""
+    year, current = iso_week(today or datetime.date.today())
+    if week < current:
+        year += 1
+    # Vecka 53 finns bara vart femte eller sjätte år
+    for candidate in range(year, year + 7):
+        if 1 <= week <= weeks_in_year(candidate):
+            return candidate, week
+    return None
+
+
+def upcoming_weeks(count, today=None, skip=1):
+    """count veckor som (år, vecka), med början skip veckor fram (1 = nästa vecka), även över årsskiftet."""
+    today = today or datetime.date.today()
+    monday = today - datetime.timedelta(days=today.weekday())
+    return [iso_week(monday + datetime.timedelta(weeks=skip + i)) for i in range(count)]
+
+
+def weeks_date_span(weeks, today=None):
+    """Veckonummer (nästa förekomst) -> (första måndag, sista söndag), None om inga giltiga veckor."""
+    pairs = (next_occurrence(week, today) for week in weeks)
+    ranges = [week_range(*pair) for pair in pairs if pair is not None]
+    if not ranges:
+        return None
+    return min(start for start, _ in ranges), max(end for _, end in ranges)
+
+
+def week_keys(weeks, today=None):
+    """
+    Veckor som heltal (nästa förekomst) eller (år, vecka) -> mängd med
+    år * 100 + vecka, samma form som filters.week_filter jämför med.
+    """
+    keys = set()
+    for week in weeks:
+        pair = week if isinstance(week, tuple) else next_occurrence(week, today)
+        if pair is not None:
+            keys.add(pair[0] * 100 + pair[1])
+    return keys
+
+
+# Tabellerna för i år och nästa år räknas fram direkt
+for _year in (datetime.date.today().year, datetime.date.today().year + 1):
+    week_table(_year)
@@ -1,52 +1,45 @@
 import streamlit as st
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-import smtplib
 
 def generera_html_mail(kurser, namn):
-    rows = ""
-    for k in kurser:
-        rows += f"""
-        <tr>
-            <td>{k.namn}</td>
-            <td>{k.datum}</td>
-            <td>{k.plats}</td>
-            <td>{k.pris}</td>
-            <td>{k.platser}</td>
-            <td><a href="{k.hemsida}">Webbplats</a></td>
-            <td><a href="{k.maps}">Karta</a></td>
-        </tr>
-        """
-    html = f"""
-    <html>
-    <body>
-    <h2>Hej {namn},</h2>
-    <p>Här är de UGL-kurser du visat intresse för:</p>
-    <table border="1" cellpadding="6" cellspacing="0" style="border-collapse: collapse;">
-        <tr style="background-color:#f2f2f2;">
-            <th>Kurs</th><th>Datum</th><th>Plats</th><th>Pris</th><th>Platstillgång</th><th>Hemsida</th><th>Karta</th>
-        </tr>
-        {rows}
-    </table>
-    <br>
-    <p>Hör gärna av dig om du har frågor eller vill boka.</p>
-    <p>Med vänliga hälsningar,<br>Ditt Kursbokningsteam</p>
-    </body>
-    </html>
+    # Mallarna (och pandas via courses) laddas först när ett mail byggs
+    from templates import overview_mail
+
+    return str(overview_mail(kurser, namn))
+
+SMTP_HOST = "smtp.office365.com"
+SMTP_PORT = 587
+
+def smtp_transport():
+    from mail_queue import SmtpTransport
+
+    return SmtpTransport(
+        SMTP_HOST, SMTP_PORT,
+        username=st.secrets["email"]["from_address"],
+        password=st.secrets["email"]["app_password"],
+    )
+
+def start_mail_worker(transport_factory=smtp_transport):
+    """
+    Startar utköns bakgrundsarbetare när appen startar, så att mail som ligger
+    kvar i kön (återförsök, eller sådana som var på väg ut vid en omstart)
+    skickas utan att vänta på att någon lägger ett nytt. Gör inget utan
+    inställningar för e-post i st.secrets.
+    """
+    try:
+        st.secrets["email"]["from_address"]
+    except (FileNotFoundError, KeyError):
+        return None
+    from mail_queue import start_worker
+
+    return start_worker(transport_factory)
+
+def skicka_mail(till, html_body, ämne="Din kursöversikt – UGL", transport_factory=smtp_transport):
+    """
+    Lägger mailet i utkön och returnerar direkt med köns id. Själva utskicket
+    görs i bakgrunden över en återanvänd SMTP-anslutning (se mail_queue.py).
     """
-    return html
+    # Kön (och SQLAlchemy/smtplib) laddas först när ett mail faktiskt skickas
+    from mail_queue import enqueue
 
-def skicka_mail(till, html_body, ämne="Din kursöversikt – UGL"):
     från = st.secrets["email"]["from_address"]
-    lösenord = st.secrets["email"]["app_password"]
-
-    msg = MIMEMultipart("alternative")
-    msg["Subject"] = ämne
-    msg["From"] = från
-    msg["To"] = till
-    msg.attach(MIMEText(html_body, "html"))
-
-    with smtplib.SMTP("smtp.office365.com", 587) as server:
-        server.starttls()
-        server.login(från, lösenord)
-        server.send_message(msg)
+    return enqueue(från, till, ämne, html_body, transport_factory)
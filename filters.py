@@ -0,0 +1,63 @@
+"""
+Vektoriserad filtrering av den kanoniska kurstabellen (se courses.py).
+
+Varje filter är en funktion (df, criteria) -> boolesk Series eller None
+(None = filtret är inte aktivt). Alla masker kombineras med & och tabellen
+indexeras en enda gång. Ett nytt filter läggs till genom att lägga till en
+funktion i FILTERS.
+"""
+from dates import upcoming_weeks, week_keys
+from travel import get_matrix
+
+# Marginal (kr) över angivet maxpris
+PRICE_MARGIN = 500
+
+
+def week_filter(df, criteria):
+    """
+    weeks: veckonummer (nästa gång veckan inträffar) och/eller (år, vecka).
+    Jämförs med både år och vecka så att vecka 1 nästa år inte blandas ihop med i år.
+    """
+    weeks = criteria.get("weeks")
+    if not weeks:
+        return None
+    keys = week_keys(weeks, criteria.get("today"))
+    return (df["ar"] * 100 + df["vecka"]).isin(keys).fillna(False).astype(bool)
+
+
+def price_filter(df, criteria):
+    max_price = criteria.get("max_price") or 0
+    if max_price <= 0:
+        return None
+    return (df["pris_kr"].fillna(0) <= max_price + PRICE_MARGIN).astype(bool)
+
+
+def travel_filter(df, criteria):
+    origin = (criteria.get("location") or "").strip()
+    max_hours = criteria.get("max_hours") or 0
+    if not origin or max_hours <= 0:
+        return None
+    times = get_matrix().travel_hours(df["ort"], origin, criteria.get("mode", "Bil"))
+    if times is None:
+        # Okänd plats för kunden: filtrera inte på restid
+        return None
+    # Kurser på orter utan känd restid visas alltid
+    return (times.isna() | (times <= max_hours)).astype(bool)
+
+
+FILTERS = [week_filter, price_filter, travel_filter]
+
+
+def default_weeks(today=None):
+    """Standardvy när inga filter är valda: de två kommande veckorna, som (år, vecka)."""
+    return set(upcoming_weeks(2, today))
+
+
+def apply_filters(df, criteria, filters=FILTERS):
+    masks = [mask for mask in (f(df, criteria) for f in filters) if mask is not None]
+    if not masks:
+        masks = [week_filter(df, {"weeks": default_weeks(criteria.get("today"))})]
+    combined = masks[0]
+    for mask in masks[1:]:
+        combined = combined & mask
+    return df[combined]
@@ -0,0 +1,94 @@
+import threading
+
+# Timeout (sekunder) för uppkoppling respektive läsning
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 10
+# Antal återförsök vid nätverksfel och 429/5xx, med exponentiell väntan
+RETRIES = 3
+BACKOFF_FACTOR = 0.5
+POOL_SIZE = 10
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; UGL-kurser/1.0)",
+    "Accept": "text/html,application/xhtml+xml,application/json;q=0.9,*/*;q=0.8",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+
+def create_session():
+    # requests importeras först när den första sessionen skapas
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET", "HEAD"],
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class ProviderHttpClient:
+    """
+    Delad HTTP-klient för leverantörssidorna: återanvänder anslutningar (keep-alive),
+    har timeouts och återförsök, och skickar villkorliga anrop (ETag/Last-Modified).
+    Svarar servern 304 lämnas det tidigare tolkade resultatet ut utan ny tolkning.
+    """
+
+    def __init__(self, session=None):
+        self._session = session
+        self._validators = {}
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        with self._lock:
+            if self._session is None:
+                self._session = create_session()
+            return self._session
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", (CONNECT_TIMEOUT, READ_TIMEOUT))
+        return self.session.get(url, **kwargs)
+
+    def get_parsed(self, url, parse, on_response=None):
+        """
+        Hämtar url och returnerar parse(response). Resultatet sparas tillsammans med
+        ETag/Last-Modified så att nästa anrop kan besvaras med 304 Not Modified.
+        on_response(response) anropas för varje svar, även 304 och fel.
+        """
+        with self._lock:
+            cached = self._validators.get(url)
+        headers = {}
+        if cached is not None:
+            etag, last_modified, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        resp = self.get(url, headers=headers)
+        if on_response is not None:
+            on_response(resp)
+        if resp.status_code == 304 and cached is not None:
+            return cached[2]
+        resp.raise_for_status()
+        parsed = parse(resp)
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        with self._lock:
+            if etag or last_modified:
+                self._validators[url] = (etag, last_modified, parsed)
+            else:
+                self._validators.pop(url, None)
+        return parsed
+
+
+http_client = ProviderHttpClient()
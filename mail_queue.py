@@ -0,0 +1,366 @@
+"""
+Utgående mail. enqueue() lägger bara meddelandet i en beständig kö (SQLite)
+och returnerar direkt; en bakgrundstråd (MailWorker) tömmer kön i omgångar
+över en återanvänd, inloggad SMTP-anslutning, med återförsök, exponentiell
+väntan och hastighetsbegränsning.
+
+Transporten är utbytbar: SmtpTransport för riktig leverans, MemoryTransport
+för utveckling, eller SmtpTransport mot en lokal SMTP-server, t.ex.
+
+    python -m aiosmtpd -n -l localhost:1025
+    SmtpTransport("localhost", 1025, starttls=False)
+"""
+import datetime
+import logging
+import os
+import threading
+
+from sqlalchemy import and_, create_engine, event, func, inspect, or_, text, update
+from sqlalchemy.orm import sessionmaker
+
+from metrics import metrics
+from models import MailBase, Utskick
+from ratelimit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+MAIL_DB_PATH = os.environ.get(
+    "UGL_MAIL_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "utskick.db")
+)
+
+# Antal mail som hämtas ur kön per omgång
+BATCH_SIZE = 20
+# Efter så här många misslyckade försök ges mailet upp
+MAX_ATTEMPTS = 5
+# Väntan (sekunder) före första återförsöket, fördubblas för varje försök
+RETRY_DELAY = 30
+# Längsta paus (sekunder) för arbetaren när anslutningen eller inloggningen inte fungerar
+MAX_CONNECTION_BACKOFF = 30 * 60
+# Högst så här många mail per minut
+RATE_PER_MINUTE = 30
+# Hur ofta (sekunder) kön kontrolleras när den är tom
+POLL_INTERVAL = 5
+# SMTP-anslutningen stängs när kön varit tom så här länge (sekunder)
+IDLE_TIMEOUT = 60
+# Ett mail som tagits ('skickas') men inte blivit klart på så här lång tid
+# (sekunder) antas tillhöra en arbetare som dött och får tas av någon annan.
+# Ska räcka för ett helt parti: BATCH_SIZE mail med SMTP-timeout och väntan.
+LEASE_SECONDS = 15 * 60
+
+NY = "ny"
+SKICKAS = "skickas"
+SKICKAD = "skickad"
+MISSLYCKAD = "misslyckad"
+
+
+def _now():
+    return datetime.datetime.now()
+
+
+def build_message(fran, till, amne, html):
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = amne
+    msg["From"] = fran
+    msg["To"] = till
+    msg.attach(MIMEText(html, "html"))
+    return msg
+
+
+####################################
+# Transporter
+####################################
+class SmtpTransport:
+    """En SMTP-anslutning som hålls öppen och inloggad mellan utskicken."""
+
+    def __init__(self, host, port, username=None, password=None, starttls=True, timeout=30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self._smtp = None
+
+    def _connect(self):
+        import smtplib
+
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            smtp.starttls()
+        if self.username:
+            smtp.login(self.username, self.password)
+        self._smtp = smtp
+
+    def send(self, msg):
+        import smtplib
+
+        if self._smtp is None:
+            self._connect()
+        try:
+            self._smtp.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # Servern har stängt en gammal anslutning: koppla upp igen en gång
+            self._connect()
+            self._smtp.send_message(msg)
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+
+
+class MemoryTransport:
+    """Sparar meddelandena i en lista i stället för att skicka dem."""
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, msg):
+        self.sent.append(msg)
+
+    def close(self):
+        pass
+
+
+def is_connection_error(error):
+    """
+    Fel som gäller anslutningen eller kontot (nätverk, inloggning, avsändare)
+    och inte det enskilda mailet. Då pausar arbetaren i stället för att
+    förbruka mailens försök.
+    """
+    import smtplib
+
+    if isinstance(error, (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError)):
+        return False
+    return isinstance(error, (smtplib.SMTPException, OSError))
+
+
+def is_permanent(error):
+    """Mottagaren eller innehållet nekades med 5xx: blir inte bättre av fler försök."""
+    import smtplib
+
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    return isinstance(error, smtplib.SMTPDataError) and error.smtp_code >= 500
+
+
+####################################
+# Kö
+####################################
+class MailQueue:
+    def __init__(self, path=MAIL_DB_PATH):
+        self.engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+        event.listen(self.engine, "connect", _sqlite_pragmas)
+        self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
+        MailBase.metadata.create_all(self.engine)
+        self._add_missing_columns()
+
+    def _add_missing_columns(self):
+        # Kön töms inte vid schemaändring, så nya kolumner läggs till i befintlig tabell
+        existing = {c["name"] for c in inspect(self.engine).get_columns(Utskick.__tablename__)}
+        with self.engine.begin() as connection:
+            for column in Utskick.__table__.columns:
+                if column.name not in existing:
+                    connection.execute(text(
+                        f"ALTER TABLE {Utskick.__tablename__} ADD COLUMN {column.name} "
+                        f"{column.type.compile(self.engine.dialect)}"
+                    ))
+
+    def put(self, fran, till, amne, html):
+        """Lägger ett mail i kön och returnerar dess id."""
+        now = _now()
+        utskick = Utskick(
+            till=till, fran=fran, amne=amne, html=html,
+            status=NY, forsok=0, nasta_forsok=now, skapad=now,
+        )
+        with self.Session.begin() as session:
+            session.add(utskick)
+        return utskick.id
+
+    def claim(self, limit=BATCH_SIZE):
+        """
+        Plockar ut upp till limit mail som är på tur och markerar dem som
+        'skickas'. Mail som en annan arbetare tagit men inte blivit klar med
+        inom LEASE_SECONDS (t.ex. för att processen avslutades) tas också.
+        """
+        now = _now()
+        due_filter = or_(
+            and_(Utskick.status == NY, Utskick.nasta_forsok <= now),
+            and_(
+                Utskick.status == SKICKAS,
+                or_(Utskick.tagen.is_(None), Utskick.tagen < now - datetime.timedelta(seconds=LEASE_SECONDS)),
+            ),
+        )
+        with self.Session.begin() as session:
+            due = (
+                session.query(Utskick)
+                .filter(due_filter)
+                .order_by(Utskick.nasta_forsok, Utskick.id)
+                .limit(limit)
+                .all()
+            )
+            claimed = []
+            for utskick in due:
+                # Villkorlig uppdatering så att två processer inte tar samma mail
+                result = session.execute(
+                    update(Utskick).where(Utskick.id == utskick.id, due_filter).values(status=SKICKAS, tagen=now)
+                )
+                if result.rowcount:
+                    claimed.append(utskick)
+            return claimed
+
+    def mark_sent(self, utskick_id):
+        with self.Session.begin() as session:
+            session.execute(
+                update(Utskick).where(Utskick.id == utskick_id).values(status=SKICKAD, skickad=_now(), fel=None)
+            )
+
+    def mark_failed(self, utskick, error, permanent=False):
+        forsok = (utskick.forsok or 0) + 1
+        values = {"forsok": forsok, "fel": str(error)[:500]}
+        if permanent or forsok >= MAX_ATTEMPTS:
+            values["status"] = MISSLYCKAD
+        else:
+            values["status"] = NY
+            values["nasta_forsok"] = _now() + datetime.timedelta(seconds=RETRY_DELAY * 2 ** (forsok - 1))
+        with self.Session.begin() as session:
+            session.execute(update(Utskick).where(Utskick.id == utskick.id).values(**values))
+        return values["status"]
+
+    def release(self, utskick_ids):
+        """Lägger tillbaka tagna mail i kön utan att räkna det som ett försök."""
+        with self.Session.begin() as session:
+            session.execute(
+                update(Utskick)
+                .where(Utskick.id.in_(utskick_ids), Utskick.status == SKICKAS)
+                .values(status=NY, tagen=None)
+            )
+
+    def counts(self):
+        """{status: antal} för hela kön."""
+        with self.Session() as session:
+            rows = session.query(Utskick.status, func.count()).group_by(Utskick.status).all()
+        return dict(rows)
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+####################################
+# Bakgrundsarbetare
+####################################
+class MailWorker(threading.Thread):
+    """Tömmer kön i omgångar via transporten. Stoppas med stop()."""
+
+    def __init__(self, queue, transport, rate_per_minute=RATE_PER_MINUTE, poll_interval=POLL_INTERVAL):
+        super().__init__(name="mail", daemon=True)
+        self.queue = queue
+        self.transport = transport
+        self.poll_interval = poll_interval
+        self.rate_limiter = RateLimiter(60 / rate_per_minute if rate_per_minute else 0)
+        self._wake = threading.Event()
+        self._stopping = False
+        # Paus efter anslutnings- eller inloggningsfel, se is_connection_error
+        self._paused_until = None
+        self._connection_failures = 0
+
+    def wake(self):
+        """Väcker arbetaren direkt i stället för vid nästa kontroll av kön."""
+        self._wake.set()
+
+    def stop(self):
+        self._stopping = True
+        self._wake.set()
+
+    def _pause(self, error):
+        self._connection_failures += 1
+        delay = min(RETRY_DELAY * 2 ** (self._connection_failures - 1), MAX_CONNECTION_BACKOFF)
+        self._paused_until = _now() + datetime.timedelta(seconds=delay)
+        logger.warning("SMTP fungerar inte, nytt försök om %d s: %s", delay, error)
+
+    def run_batch(self):
+        """Skickar ett parti och returnerar antalet mail som togs ur kön."""
+        if self._paused_until is not None and _now() < self._paused_until:
+            return 0
+        batch = self.queue.claim()
+        for i, utskick in enumerate(batch):
+            self.rate_limiter.wait()
+            try:
+                with metrics.timer("mail"):
+                    self.transport.send(build_message(utskick.fran, utskick.till, utskick.amne, utskick.html))
+            except Exception as e:
+                # Anslutningen kan vara i ett okänt läge efter ett fel
+                self.transport.close()
+                if is_connection_error(e):
+                    # Felet gäller inte mailen: lägg tillbaka resten av partiet och pausa
+                    self.queue.release([u.id for u in batch[i:]])
+                    self._pause(e)
+                    break
+                status = self.queue.mark_failed(utskick, e, permanent=is_permanent(e))
+                logger.warning("Mail %s till %s misslyckades (%s): %s", utskick.id, utskick.till, status, e)
+            else:
+                self.queue.mark_sent(utskick.id)
+                self._connection_failures = 0
+                self._paused_until = None
+        if batch:
+            metrics.set("mail_queue", sum(self.queue.counts().get(s, 0) for s in (NY, SKICKAS)))
+        return len(batch)
+
+    def run(self):
+        idle_since = None
+        while not self._stopping:
+            try:
+                sent = self.run_batch()
+            except Exception:
+                logger.exception("Utkön kunde inte läsas")
+                sent = 0
+            if sent:
+                idle_since = None
+                continue
+            idle_since = idle_since or _now()
+            if (_now() - idle_since).total_seconds() >= IDLE_TIMEOUT:
+                self.transport.close()
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+        self.transport.close()
+
+
+_queue = None
+_worker = None
+_lock = threading.Lock()
+
+
+def get_queue():
+    global _queue
+    with _lock:
+        if _queue is None:
+            _queue = MailQueue()
+        return _queue
+
+
+def start_worker(transport_factory):
+    """Startar bakgrundsarbetaren en gång per process; transport_factory() ger transporten."""
+    global _worker
+    queue = get_queue()
+    with _lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = MailWorker(queue, transport_factory())
+            _worker.start()
+        return _worker
+
+
+def enqueue(fran, till, amne, html, transport_factory):
+    """Lägger mailet i kön, ser till att arbetaren är igång och returnerar köns id."""
+    utskick_id = get_queue().put(fran, till, amne, html)
+    start_worker(transport_factory).wake()
+    return utskick_id
@@ -0,0 +1,153 @@
+"""
+Slår ihop samma kurs när den finns hos flera leverantörer, t.ex. ett Rezon-
+tillfälle på Tylebäck som också listas på uglkurser.se som Sundbyholms Slott.
+
+Raderna delas först upp i block på (startdatum, ort) så att bara kurser i
+samma block jämförs med varandra; de flesta block har en enda rad och hoppas
+över direkt. Orten slås upp i travel.py:s ortlista, eftersom leverantörerna
+inte delar upp anläggning och ort likadant: Rezons 'Boda Art Hotel Kosta' och
+Corecodes 'Kosta' hamnar i samma block. Inom ett block räknas två rader från
+olika källor som samma kurs om anläggning + ort liknar varandra (se same_venue).
+"""
+import difflib
+
+import pandas as pd
+
+from travel import fold, get_matrix, normalise
+
+# Vilken källas rad som behålls när en kurs finns på flera ställen; arrangörens
+# egen sida först, uglkurser.se sist eftersom den listar alla arrangörer
+SOURCE_PRIORITY = ["Rezon", "Corecode", "Uglkurser"]
+
+# Skiljetecken mellan nycklarna i kolumnen sammanslagna (förekommer inte i celltext)
+KEY_SEPARATOR = "\x1f"
+
+# Fält som fylls i från de andra källorna när den behållna raden saknar dem
+FILLED_FIELDS = ["slut", "handledare", "pris_kr"]
+
+VENUE_SIMILARITY = 0.85
+
+# Småord som inte säger något om vilken anläggning det är
+_STOPWORDS = {"och", "kurs", "konferens", "hotell", "hotel", "gård", "gard"}
+
+
+def venue_key(text):
+    return fold(normalise(text))
+
+
+def town_key(ort):
+    """Ort -> blocknyckel: ortens plats i travel-matrisen, eller normaliserad text om orten är okänd."""
+    index = get_matrix().resolve(ort)
+    return f"#{index}" if index is not None else venue_key(ort)
+
+
+def same_venue(a, b):
+    """Jämför två venue_key. Tom anläggning räknas som samma (orten avgör då)."""
+    if not a or not b or a == b:
+        return True
+    words_a = set(a.split()) - _STOPWORDS
+    words_b = set(b.split()) - _STOPWORDS
+    if words_a and words_b and (words_a <= words_b or words_b <= words_a):
+        return True
+    return difflib.SequenceMatcher(None, a, b).ratio() >= VENUE_SIMILARITY
+
+
+def _clusters(rows):
+    """rows: lista med (position, kalla, venue_key) i samma block -> lista med kluster."""
+    clusters = []
+    for row in rows:
+        for cluster in clusters:
+            # En källa kan ha flera tillfällen samma dag på samma ort, de är olika kurser
+            if all(row[1] != other[1] for other in cluster) and same_venue(row[2], cluster[0][2]):
+                cluster.append(row)
+                break
+        else:
+            clusters.append([row])
+    return clusters
+
+
+def _priority(kalla):
+    return SOURCE_PRIORITY.index(kalla) if kalla in SOURCE_PRIORITY else len(SOURCE_PRIORITY)
+
+
+def merge_courses(df):
+    """
+    Kanonisk DataFrame från flera källor -> en rad per kurs. Kolumnen kallor
+    anger alla källor som listar kursen, i SOURCE_PRIORITY-ordning, och
+    sammanslagna nycklarna för raderna som slogs ihop med den (se key_aliases).
+    """
+    df = df.reset_index(drop=True).assign(kallor=df["kalla"].to_numpy(), sammanslagna="")
+    if df.empty:
+        return df
+
+    start = df["start"].dt.strftime("%Y-%m-%d")
+    # map slår upp varje unik ort en gång; astype(str) eftersom orten kan vara
+    # en kategorikolumn (se snapshot.py)
+    towns = {ort: town_key(ort) for ort in pd.unique(df["ort"])}
+    blocks = (start + "|" + df["ort"].map(towns).astype(str))[start.notna()]
+    candidates = blocks[blocks.duplicated(keep=False)]
+    if candidates.empty:
+        return df
+
+    kalla = df["kalla"].to_numpy()
+    # Anläggning och ort jämförs tillsammans; tom anläggning ger tom nyckel (orten avgör då)
+    venues = list(zip(df["anlaggning"].to_numpy(), df["ort"].to_numpy()))
+    venue_keys = {
+        venue: venue_key(f"{venue[0]} {venue[1]}") if venue[0] else ""
+        for venue in {venues[p] for p in candidates.index}
+    }
+    kallor = df["kallor"].to_numpy(copy=True)
+    nycklar = df["nyckel"].to_numpy()
+    sammanslagna = {}
+    fill = {}
+    drop = []
+    for positions in candidates.groupby(candidates, sort=False).indices.values():
+        rows = sorted(
+            ((p, kalla[p], venue_keys[venues[p]]) for p in candidates.index[positions]),
+            key=lambda row: _priority(row[1]),
+        )
+        for cluster in _clusters(rows):
+            if len(cluster) == 1:
+                continue
+            keep, others = cluster[0][0], [p for p, _, _ in cluster[1:]]
+            kallor[keep] = ", ".join(k for _, k, _ in cluster)
+            sammanslagna[keep] = KEY_SEPARATOR.join(nycklar[p] for p in others)
+            fill[keep] = others
+            drop.extend(others)
+    if not drop:
+        return df
+
+    df["kallor"] = kallor
+    column = df["sammanslagna"].to_numpy(copy=True)
+    column[list(sammanslagna)] = list(sammanslagna.values())
+    df["sammanslagna"] = column
+    for field in FILLED_FIELDS:
+        missing = df[field].isna()
+        if pd.api.types.is_string_dtype(df[field]):
+            missing = missing | (df[field] == "")
+        missing = missing.to_numpy()
+        filled = {}
+        for keep, others in fill.items():
+            if missing[keep]:
+                source = next((p for p in others if not missing[p]), None)
+                if source is not None:
+                    filled[keep] = source
+        if filled:
+            column = df[field].copy()
+            column.iloc[list(filled)] = column.iloc[list(filled.values())].to_numpy()
+            df[field] = column
+    return df.drop(index=drop).reset_index(drop=True)
+
+
+def key_aliases(df):
+    """
+    Resultat från merge_courses -> {nyckel för en rad som slogs ihop: nyckel
+    för raden som behölls}, så att en vald kurs hittas även när en annan
+    källa börjat lista den och tagit över raden.
+    """
+    merged = df[df["sammanslagna"] != ""]
+    return {
+        alias: kept
+        for kept, aliases in zip(merged["nyckel"], merged["sammanslagna"])
+        for alias in aliases.split(KEY_SEPARATOR)
+    }
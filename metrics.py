@@ -0,0 +1,147 @@
+"""
+Tidmätning per steg (hämtning, webbläsare, tolkning, databas, sammanslagning,
+filtrering, rendering), per leverantör där det är relevant, plus enstaka
+värden som antal byte, HTTP-status och antal rader.
+
+Mätvärdena visas i appens felsökningspanel (UGL_DEBUG=1 eller ?debug=1),
+kan hämtas i Prometheus textformat från serve() och loggas som en JSON-rad
+per mätning på DEBUG-nivå i loggern "metrics".
+"""
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("metrics")
+
+PREFIX = "ugl"
+
+
+class StageStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.max = 0.0
+
+    def add(self, seconds, failed=False):
+        self.count += 1
+        self.errors += failed
+        self.total += seconds
+        self.last = seconds
+        self.max = max(self.max, seconds)
+
+
+class Metrics:
+    def __init__(self):
+        self._stages = {}
+        self._values = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def timer(self, stage, provider=""):
+        """Mäter tiden för with-blocket. Ett undantag räknas som fel och skickas vidare."""
+        start = time.perf_counter()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            self.observe(stage, time.perf_counter() - start, provider, failed)
+
+    def observe(self, stage, seconds, provider="", failed=False):
+        with self._lock:
+            self._stages.setdefault((stage, provider), StageStats()).add(seconds, failed)
+        logger.debug(json.dumps({"steg": stage, "leverantor": provider, "ms": round(seconds * 1000, 2), "fel": failed}))
+
+    def set(self, name, value, provider=""):
+        with self._lock:
+            self._values[(name, provider)] = value
+        logger.debug(json.dumps({"varde": name, "leverantor": provider, "nu": value}))
+
+    def stage_rows(self):
+        """En rad per (steg, leverantör) för visning i appen."""
+        with self._lock:
+            items = sorted(self._stages.items())
+        return [
+            {
+                "Steg": stage,
+                "Leverantör": provider,
+                "Antal": s.count,
+                "Fel": s.errors,
+                "Senaste ms": round(s.last * 1000, 1),
+                "Snitt ms": round(s.total / s.count * 1000, 1),
+                "Max ms": round(s.max * 1000, 1),
+            }
+            for (stage, provider), s in items
+        ]
+
+    def values(self):
+        """{(namn, leverantör): värde} för de senast satta värdena."""
+        with self._lock:
+            return dict(self._values)
+
+    def prometheus(self):
+        """Alla mätvärden i Prometheus textformat."""
+        with self._lock:
+            stages = sorted(self._stages.items())
+            values = sorted(self._values.items())
+        lines = [
+            f"# TYPE {PREFIX}_stage_seconds summary",
+            f"# TYPE {PREFIX}_stage_errors_total counter",
+            f"# TYPE {PREFIX}_stage_last_seconds gauge",
+        ]
+        for (stage, provider), s in stages:
+            labels = _labels(stage=stage, provider=provider)
+            lines.append(f"{PREFIX}_stage_seconds_count{labels} {s.count}")
+            lines.append(f"{PREFIX}_stage_seconds_sum{labels} {s.total:.6f}")
+            lines.append(f"{PREFIX}_stage_errors_total{labels} {s.errors}")
+            lines.append(f"{PREFIX}_stage_last_seconds{labels} {s.last:.6f}")
+        typed = set()
+        for (name, provider), value in values:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {PREFIX}_{name} gauge")
+            lines.append(f"{PREFIX}_{name}{_labels(provider=provider)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels):
+    parts = [f'{key}="{value}"' for key, value in labels.items() if value]
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+metrics = Metrics()
+
+_server = None
+_server_lock = threading.Lock()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port, host="0.0.0.0"):
+    """Startar /metrics på port i en bakgrundstråd, en gång per process."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _Handler)
+            threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+            logger.info("Mätvärden på http://%s:%d/metrics", host, port)
+        return _server
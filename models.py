@@ -1,5 +1,5 @@
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Date, DateTime, Text
 
 Base = declarative_base()
 
@@ -7,11 +7,60 @@ class Kurs(Base):
     __tablename__ = 'kurser'
 
     id = Column(Integer, primary_key=True)
+    # Stabil nyckel: källa|startdatum|anläggning|ort[#n] (se changes.course_keys)
+    nyckel = Column(String, unique=True, nullable=False)
+    innehall_hash = Column(String)
+    kalla = Column(String, index=True)
     namn = Column(String)
+    # Visningstext, t.ex. '5/1 - 9/1 26'
     datum = Column(String)
+    start = Column(Date)
+    slut = Column(Date)
+    ar = Column(Integer)
+    vecka = Column(Integer, index=True)
+    # Visningstext, t.ex. 'Få'
     platser = Column(String)
+    platser_antal = Column(Integer)
+    platser_status = Column(String)
     plats = Column(String)
+    ort = Column(String, index=True)
+    # Visningstext, t.ex. '24 900 kr'
     pris = Column(String)
+    pris_kr = Column(Integer, index=True)
     hemsida = Column(String)
     maps = Column(String)
     handledare = Column(String)
+
+class Hamtning(Base):
+    """Senaste lyckade hämtning per källa."""
+    __tablename__ = 'hamtningar'
+
+    kalla = Column(String, primary_key=True)
+    senast_ok = Column(DateTime)
+    # Senaste hämtning som faktiskt ändrade något
+    senast_andrad = Column(DateTime)
+    rader = Column(Integer)
+
+
+# Utkön för mail ligger i en egen databas som inte rensas vid schemaändring
+# av kursdatabasen (se mail_queue.py)
+MailBase = declarative_base()
+
+class Utskick(MailBase):
+    """Ett mail i utkön."""
+    __tablename__ = 'utskick'
+
+    id = Column(Integer, primary_key=True)
+    till = Column(String, nullable=False)
+    fran = Column(String)
+    amne = Column(String)
+    html = Column(Text)
+    # 'ny', 'skickas', 'skickad' eller 'misslyckad'
+    status = Column(String, index=True, nullable=False)
+    forsok = Column(Integer, default=0)
+    nasta_forsok = Column(DateTime, index=True)
+    skapad = Column(DateTime)
+    # När en arbetare tog mailet (status 'skickas'), se mail_queue.LEASE_SECONDS
+    tagen = Column(DateTime)
+    skickad = Column(DateTime)
+    fel = Column(String)
@@ -0,0 +1,35 @@
+import importlib.util
+
+# lxml är betydligt snabbare än html.parser men vi klarar oss utan
+PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+
+def parse_tables(html):
+    """Tolkar endast tabellerna i html och returnerar en lista med <table>-element."""
+    # bs4 importeras först vid första tolkningen
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    # Bygg bara upp <table>-element, resten av sidan (menyer, skript, sidfot) hoppas över
+    soup = BeautifulSoup(html, PARSER, parse_only=SoupStrainer("table"))
+    return soup.find_all("table")
+
+
+def first_table(html):
+    tables = parse_tables(html)
+    return tables[0] if tables else None
+
+
+def header_texts(table):
+    first_row = table.find("tr")
+    if not first_row:
+        return []
+    return [th.get_text(strip=True) for th in first_row.find_all("th")]
+
+
+def body_rows(table):
+    """Alla rader utom rubrikraden."""
+    return table.find_all("tr")[1:]
+
+
+def row_cells(tr):
+    return [td.get_text(strip=True) for td in tr.find_all("td")]
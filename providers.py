@@ -0,0 +1,118 @@
+"""
+Register över kursleverantörer. En leverantör beskrivs av en Provider:
+var sidan finns, hur den delas upp i råa rader och hur en rad blir en
+kanonisk kurspost (courses.make_course). Hämtning, cache, databas och
+parallell körning i scrapers.py gäller sedan alla registrerade leverantörer.
+
+    register(Provider("Ny leverantör", "https://...", to_course=process_ny_row))
+
+Som standard hämtas sidan med den delade HTTP-klienten och första tabellen
+läses som {rubrik: cell} per rad (se table_rows). Med UGL_FIXTURE_DIR satt
+läses i stället <katalog>/<namn>.html, så att allt kan köras utan nätverk
+(se benchmarks/make_fixtures.py; sidorna i benchmarks/fixtures är syntetiska).
+"""
+import os
+
+from http_client import http_client
+from metrics import metrics
+from parsing import body_rows, header_texts, parse_tables, row_cells
+from ratelimit import RateLimiter
+
+# Maxtid (sekunder) innan en hämtning räknas som misslyckad
+DEFAULT_TIMEOUT = 20
+# Hur länge (sekunder) en hämtning räknas som färsk
+DEFAULT_TTL = 15 * 60
+# Minsta tid (sekunder) mellan två hämtningar mot samma leverantör
+DEFAULT_MIN_INTERVAL = 5
+
+# Katalog med sparade sidor att använda i stället för nätverket
+FIXTURE_DIR = os.environ.get("UGL_FIXTURE_DIR")
+
+registry = {}
+
+
+class MissingCourseData(RuntimeError):
+    """Sidan hämtades men kurstabellen saknas (ändrad layout, underhållssida o.d.)."""
+
+
+def register(provider):
+    """Lägger till (eller ersätter) en leverantör och returnerar den."""
+    registry[provider.name] = provider
+    return provider
+
+
+def table_rows(html, required_headers=()):
+    """
+    Första tabellen som har alla required_headers -> lista med {rubrik: cell}.
+    None om ingen sådan tabell finns på sidan.
+    """
+    for table in parse_tables(html):
+        headers = header_texts(table)
+        if all(h in headers for h in required_headers):
+            rows = (row_cells(tr) for tr in body_rows(table))
+            return [dict(zip(headers, cells)) for cells in rows if cells]
+    return None
+
+
+class Provider:
+    """
+    name: källans namn (kalla) i kursposterna.
+    url: sidan som hämtas, sparas också som hemsida i databasen.
+    to_course: rå rad -> kurspost (courses.make_course), eller None för att hoppa över raden.
+    rows: html -> lista med råa rader, eller None om sidan saknar kursdata.
+        Standard är table_rows med required_headers.
+    fetch: provider -> lista med kursposter, för leverantörer som inte räcker
+        med en vanlig HTTP-hämtning. Standard är fetch_http.
+    """
+
+    def __init__(self, name, url, to_course, rows=None, required_headers=(), fetch=None,
+                 timeout=DEFAULT_TIMEOUT, ttl=DEFAULT_TTL, min_interval=DEFAULT_MIN_INTERVAL):
+        self.name = name
+        self.url = url
+        self.to_course = to_course
+        self.rows = rows or (lambda html: table_rows(html, required_headers))
+        self.fetch = fetch or Provider.fetch_http
+        self.timeout = timeout
+        self.ttl = ttl
+        self.rate_limiter = RateLimiter(min_interval)
+
+    def parse(self, html):
+        """html -> lista med kursposter, eller None om sidan saknar kursdata."""
+        with metrics.timer("parse", self.name):
+            rows = self.rows(html)
+            if rows is None:
+                return None
+            courses = [course for course in map(self.to_course, rows) if course is not None]
+        metrics.set("rows", len(courses), self.name)
+        return courses
+
+    def _record_response(self, resp):
+        metrics.set("http_status", resp.status_code, self.name)
+        metrics.set("fetch_bytes", len(resp.content), self.name)
+
+    def fixture_path(self, directory=None):
+        return os.path.join(directory or FIXTURE_DIR, f"{self.name}.html")
+
+    def fetch_http(self):
+        if FIXTURE_DIR:
+            with open(self.fixture_path(), "rb") as f:
+                return self.parse(f.read())
+        # Villkorligt anrop: oförändrad sida (304) ger förra tolkningen utan ny tolkning.
+        # Tiden för "fetch" inkluderar tolkningen, som också mäts för sig som "parse".
+        with metrics.timer("fetch", self.name):
+            return http_client.get_parsed(self.url, lambda resp: self.parse(resp.content), self._record_response)
+
+    def fetch_records(self):
+        """
+        Hämtar och tolkar leverantörens sida, med hänsyn till rate limit.
+        Saknas kurstabellen kastas MissingCourseData, så att den senast
+        hämtade datan behålls i stället för att ersättas av en tom lista.
+        """
+        self.rate_limiter.wait()
+        records = self.fetch(self)
+        if records is None:
+            raise MissingCourseData(f"Kurstabellen saknas på {self.url}")
+        return records
+
+    def __repr__(self):
+        return f"Provider({self.name!r})"
@@ -0,0 +1,23 @@
+"""
+Hastighetsbegränsning som delas av skrapningen (providers.py) och utkön för
+mail (mail_queue.py). Bara standardbiblioteket, så att ingen av dem drar in
+den andras beroenden.
+"""
+import threading
+import time
+
+
+class RateLimiter:
+    """Ser till att det går minst min_interval sekunder mellan anropen till wait()."""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            delay = self._next - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._next = time.monotonic() + self.min_interval
@@ -0,0 +1,135 @@
+"""
+Fristående skrapa som uppdaterar databasen enligt schema, skild från Streamlit-appen.
+
+    python scrape_worker.py              # kör som daemon
+    python scrape_worker.py --once       # hämta alla leverantörer en gång
+    python scrape_worker.py --status     # visa senaste lyckade hämtning per källa
+    python scrape_worker.py --metrics-port 9108   # daemon med /metrics för Prometheus
+    python scrape_worker.py --snapshot kurser.arrow  # skriv också en ögonblicksbild (snapshot.py)
+
+Starta appen med UGL_SCRAPE_MODE=extern så läser den bara från databasen,
+eller med UGL_SCRAPE_MODE=snapshot så läser den bara ögonblicksbilden.
+"""
+import argparse
+import logging
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import serve as serve_metrics
+import scrapers
+import store
+
+logger = logging.getLogger("scrape_worker")
+
+# Slumpmässig förskjutning av varje körning (andel av intervallet)
+JITTER = 0.1
+# Väntetid (sekunder) innan nytt försök efter ett misslyckande
+RETRY_DELAY = 60
+
+_executor = ThreadPoolExecutor(max_workers=len(scrapers.PROVIDERS), thread_name_prefix="worker")
+
+
+def next_run(interval, now=None):
+    now = time.time() if now is None else now
+    return now + interval * (1 + random.uniform(-JITTER, JITTER))
+
+
+def run_provider(name):
+    start = time.monotonic()
+    try:
+        frame = scrapers.refresh_provider(name)
+    except Exception:
+        logger.exception("%s: hämtningen misslyckades", name)
+        return False
+    changeset = scrapers.last_changes.get(name)
+    logger.info("%s: %d kurser på %.1f s (%s), %s", name, len(frame), time.monotonic() - start,
+                scrapers.fetch_paths.get(name, "http"), changeset.summary() if changeset is not None else "ej sparad")
+    return True
+
+
+def write_snapshot(path):
+    if not path:
+        return
+    # pyarrow laddas bara när ögonblicksbilder används
+    import snapshot
+
+    try:
+        rows = snapshot.export(path)
+    except Exception:
+        logger.exception("Kunde inte skriva ögonblicksbilden %s", path)
+        return
+    logger.info("Ögonblicksbild med %d kurser skriven till %s", rows, path)
+
+
+def run_once(names, snapshot_path=None):
+    futures = {name: _executor.submit(run_provider, name) for name in names}
+    results = {name: future.result() for name, future in futures.items()}
+    if any(results.values()):
+        write_snapshot(snapshot_path)
+    return results
+
+
+def run_forever(names, intervals, snapshot_path=None):
+    # Första varvet sprids ut så att alla leverantörer inte hämtas samtidigt
+    due = {name: time.time() + random.uniform(0, JITTER * intervals[name]) for name in names}
+    running = {}
+    while True:
+        now = time.time()
+        for name in names:
+            if name in running or due[name] > now:
+                continue
+            running[name] = _executor.submit(run_provider, name)
+        for name, future in list(running.items()):
+            if future.done():
+                del running[name]
+                ok = future.result()
+                due[name] = next_run(intervals[name] if ok else RETRY_DELAY)
+                if ok:
+                    # Skrivs även när inget ändrats så att läsarna ser att källan är färsk
+                    write_snapshot(snapshot_path)
+        waiting = [due[name] for name in names if name not in running]
+        sleep_for = min(waiting) - time.time() if waiting else 1
+        time.sleep(min(max(sleep_for, 0.5), 5))
+
+
+def print_status():
+    hamtningar = store.last_success()
+    for name in scrapers.PROVIDERS:
+        h = hamtningar.get(name)
+        if h is None:
+            print(f"{name:<12} aldrig hämtad")
+        else:
+            print(f"{name:<12} {h.senast_ok:%Y-%m-%d %H:%M:%S}  {h.rader} kurser")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Skrapar UGL-leverantörer till den lokala databasen.")
+    parser.add_argument("--once", action="store_true", help="hämta en gång och avsluta")
+    parser.add_argument("--status", action="store_true", help="visa senaste lyckade hämtning per källa")
+    parser.add_argument("--provider", action="append", choices=list(scrapers.PROVIDERS),
+                        help="begränsa till en leverantör (kan anges flera gånger)")
+    parser.add_argument("--metrics-port", type=int, default=os.environ.get("UGL_METRICS_PORT"),
+                        help="visa mätvärden i Prometheus-format på http://<värd>:<port>/metrics")
+    parser.add_argument("--snapshot", default=os.environ.get("UGL_SNAPSHOT_PATH"),
+                        help="skriv en ögonblicksbild (.arrow eller .parquet) efter varje hämtning")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if args.status:
+        print_status()
+        return 0
+    if args.metrics_port:
+        serve_metrics(int(args.metrics_port))
+    names = args.provider or list(scrapers.PROVIDERS)
+    if args.once:
+        results = run_once(names, args.snapshot)
+        return 0 if all(results.values()) else 1
+    # Varje leverantör hämtas ungefär lika ofta som dess TTL i appen
+    run_forever(names, scrapers.provider_settings("ttl"), args.snapshot)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,384 @@
+import pandas as pd
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+# Selenium, requests och BeautifulSoup importeras först när de behövs,
+# se fetch_corecode_html_browser, http_client.py och parsing.py
+from cache import TTLCache
+from courses import FA, course_frame, make_course, parse_price, parse_seats, parse_week
+from dates import parse_date_range, parse_iso_date
+from merge import key_aliases, merge_courses
+from metrics import metrics
+from parsing import body_rows, header_texts, parse_tables
+from providers import Provider, register, registry
+from textnorm import join_names, split_names, split_words, sum_prices
+import store
+
+logger = logging.getLogger(__name__)
+
+# Maxtid (sekunder) att vänta på att Corecodes tabell renderas
+CORECODE_TABLE_WAIT = 15
+
+####################################
+# 1) UGL-data (uglkurser.se)
+####################################
+UGL_URL = "https://www.uglkurser.se/datumochpriser.php"
+
+UGL_REQUIRED_HEADERS = ("Kursdatum", "Kursplats", "Kursledare", "Pris")
+
+def ugl_rows(html):
+    """
+    Varje kursrad som en lista med textraderna i cellerna för
+    UGL_REQUIRED_HEADERS, None om ingen tabell har de rubrikerna.
+    """
+    for table in parse_tables(html):
+        headers = header_texts(table)
+        if all(h in headers for h in UGL_REQUIRED_HEADERS):
+            columns = [headers.index(h) for h in UGL_REQUIRED_HEADERS]
+            rows = []
+            for row in body_rows(table):
+                cols = row.find_all("td")
+                if len(cols) > max(columns):
+                    rows.append([list(cols[i].stripped_strings) for i in columns])
+            return rows
+    return None
+
+def process_ugl_row(cells):
+    kursdatum_rader, kursplats_rader, kursledare_rader, pris_rader = cells[:4]
+    datum = kursdatum_rader[0] if kursdatum_rader else ""
+    start, slut = parse_date_range(datum)
+    vecka = parse_week(kursdatum_rader[1]) if len(kursdatum_rader) > 1 else None
+    anlaggning_och_ort = kursplats_rader[0] if kursplats_rader else ""
+    splitted = anlaggning_och_ort.split(",")
+    anlaggning = splitted[0].strip()
+    ort = splitted[1].strip() if len(splitted)>1 else ""
+    platser_kvar = ""
+    if len(kursplats_rader) > 1 and "Platser kvar:" in kursplats_rader[1]:
+        platser_kvar = kursplats_rader[1].split("Platser kvar:")[1].strip()
+    h1 = split_words(kursledare_rader[0]) if kursledare_rader else ""
+    h2 = split_words(kursledare_rader[1]) if len(kursledare_rader)>1 else ""
+    handledare = join_names(h1, h2)
+    pris = pris_rader[0] if pris_rader else ""
+    platser, platser_status = parse_seats(platser_kvar)
+    return make_course(
+        "Uglkurser", start, slut, anlaggning, ort, handledare,
+        parse_price(pris), platser, platser_status, vecka=vecka,
+    )
+
+UGL = register(Provider("Uglkurser", UGL_URL, to_course=process_ugl_row, rows=ugl_rows))
+
+####################################
+# 2) Rezon-data (rezon.se)
+####################################
+def process_rezon_row(row_dict):
+    kursdatum = row_dict.get("Kursdatum", "")
+    week_part = ""
+    date_part = kursdatum.strip()
+    if "Vecka" in kursdatum:
+        parts = kursdatum.split("Vecka", 1)
+        date_part = parts[0].strip()
+        week_part = parts[1].strip()
+    start, slut = parse_date_range(date_part)
+    utbildningsort = row_dict.get("Utbildningsort", "")
+    if "Tylebäck" in utbildningsort:
+        new_anlaggning = "Sundbyholms Slott"
+        new_ort = "Eskilstuna"
+    else:
+        utd = split_words(utbildningsort)
+        parts = utd.split()
+        new_anlaggning = parts[0] if parts else utd
+        new_ort = " ".join(parts[1:]) if len(parts)>1 else ""
+    handledare_combined = join_names(*split_names(row_dict.get("Handledare", "")))
+    total_price = sum_prices(row_dict.get("Pris", ""))
+    boknings = row_dict.get("Bokningsdetaljer", "")
+    if "fullbokad" in boknings.lower():
+        platser, platser_status = None, FA
+    else:
+        platser, platser_status = parse_seats(boknings)
+    return make_course(
+        "Rezon", start, slut, new_anlaggning, new_ort, handledare_combined,
+        total_price, platser, platser_status, vecka=parse_week(week_part),
+    )
+
+REZON_URL = "https://rezon.se/kurskategorier/ugl/"
+# Rubriker som måste finnas för att vi ska lita på tabellen
+REZON_REQUIRED_HEADERS = ("Kursdatum", "Utbildningsort", "Pris")
+
+REZON = register(Provider(
+    "Rezon", REZON_URL, to_course=process_rezon_row, required_headers=REZON_REQUIRED_HEADERS,
+))
+
+####################################
+# 3) Corecode-data (HTTP först, Selenium vid behov)
+####################################
+CORECODE_URL = "https://www.corecode.se/oppna-utbildningar/ugl-utbildning?showall=true&filterBookables=-1"
+# Rubriker som måste finnas för att vi ska lita på tabellen
+CORECODE_REQUIRED_HEADERS = ("Startdatum", "Plats", "Pris")
+
+# Vilken väg ("http" eller "webbläsare") som senast gav data, per leverantör
+fetch_paths = {}
+
+def fetch_corecode_html_browser():
+    # Selenium laddas bara om HTTP-vägen inte räckte
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    from browser_pool import browser_pool
+
+    with browser_pool.driver() as driver:
+        driver.get(CORECODE_URL)
+        # Vänta tills tabellen har renderats i stället för en fast paus
+        try:
+            WebDriverWait(driver, CORECODE_TABLE_WAIT).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "table tr td"))
+            )
+        except TimeoutException:
+            pass
+        return driver.page_source
+
+def process_corecode_row(row_dict):
+    # För Corecode: "Startdatum", "Plats", "Handledare", "Platser kvar", "Pris"
+    start = parse_iso_date(row_dict.get("Startdatum", ""))
+    plats = row_dict.get("Plats", "")
+    if ":" in plats:
+        left, right = plats.split(":", 1)
+        anlaggning = left.strip()
+        ort = right.strip()
+    else:
+        anlaggning = plats
+        ort = ""
+    handledare = split_words(row_dict.get("Handledare", ""))
+    platser, platser_status = parse_seats(row_dict.get("Platser kvar", ""))
+    return make_course(
+        "Corecode", start, None, anlaggning, ort, handledare,
+        parse_price(row_dict.get("Pris", "")), platser, platser_status,
+    )
+
+def fetch_corecode(provider):
+    """
+    Försöker först med en vanlig HTTP-hämtning. Bara om kurstabellen saknas
+    i svaret (t.ex. om den renderas med JavaScript) startas en webbläsare.
+    """
+    import requests
+
+    rows = None
+    try:
+        rows = provider.fetch_http()
+        fetch_paths[provider.name] = "http"
+    except requests.RequestException:
+        pass
+    if rows is None:
+        with metrics.timer("browser", provider.name):
+            html = fetch_corecode_html_browser()
+        rows = provider.parse(html)
+        fetch_paths[provider.name] = "webbläsare"
+    return rows
+
+CORECODE = register(Provider(
+    "Corecode", CORECODE_URL, to_course=process_corecode_row,
+    required_headers=CORECODE_REQUIRED_HEADERS, fetch=fetch_corecode, timeout=45, ttl=30 * 60,
+))
+
+
+####################################
+# 4) Parallell hämtning från alla leverantörer
+####################################
+# Alla registrerade leverantörer (se providers.py), i registreringsordning
+PROVIDERS = registry
+
+# Delad trådpool så att en hängande hämtning inte blockerar nästa körning
+_executor = ThreadPoolExecutor(max_workers=2 * len(PROVIDERS), thread_name_prefix="scraper")
+
+# Processgemensam cache: alla sessioner och omkörningar läser härifrån.
+# DataFrames i cachen delas mellan sessioner och ska behandlas som skrivskyddade.
+scrape_cache = TTLCache()
+_inflight = {}
+_inflight_lock = threading.Lock()
+_warmed = False
+# Senaste changes.ChangeSet per leverantör
+last_changes = {}
+# Vilken version (Hamtning.senast_andrad) av varje källa som ligger i cachen
+_store_versions = {}
+
+def provider_settings(attr):
+    """{namn: inställning} för alla leverantörer, t.ex. provider_settings("timeout")."""
+    return {name: getattr(provider, attr) for name, provider in PROVIDERS.items()}
+
+def refresh_provider(name):
+    """Hämtar en leverantör, lägger resultatet i cachen och sparar ändringarna i databasen."""
+    provider = PROVIDERS[name]
+    with metrics.timer("total", name):
+        records = provider.fetch_records()
+    with metrics.timer("frame", name):
+        frame = course_frame(records)
+    previous = scrape_cache.get(name)
+    try:
+        with metrics.timer("store", name):
+            changeset = store.save_provider_frame(name, frame, hemsida=provider.url)
+    except Exception:
+        logger.exception("Kunde inte spara %s i databasen", name)
+        changeset = None
+    if changeset is not None:
+        last_changes[name] = changeset
+        if not changeset and previous is not None:
+            # Inget har ändrats: behåll samma DataFrame så att allt som
+            # cachats utifrån den fortfarande gäller, förnya bara åldern
+            frame = previous.value
+    scrape_cache.put(name, frame)
+    return frame
+
+def warm_cache_from_store():
+    """Fyller cachen från databasen en gång per process så att en omstart börjar varm."""
+    global _warmed
+    with _inflight_lock:
+        if _warmed:
+            return
+        _warmed = True
+    for name in PROVIDERS:
+        if scrape_cache.get(name) is not None:
+            continue
+        try:
+            stored = store.load_provider(name)
+        except Exception:
+            logger.exception("Kunde inte läsa %s från databasen", name)
+            continue
+        if stored is not None:
+            frame, senast_ok = stored
+            scrape_cache.put(name, frame, stored_at=senast_ok.timestamp())
+
+def _submit_refresh(name):
+    """Startar en hämtning om ingen redan pågår för leverantören och returnerar dess future."""
+    with _inflight_lock:
+        future = _inflight.get(name)
+        if future is None or future.done():
+            future = _executor.submit(refresh_provider, name)
+            _inflight[name] = future
+        return future
+
+def fetch_all_providers(timeouts=None, ttls=None, refresh=False):
+    """
+    Hämtar alla leverantörer parallellt, via den delade cachen.
+    Färska värden returneras direkt. Inaktuella värden returneras också direkt
+    men uppdateras i bakgrunden. Saknas värde (eller refresh=True) hämtas det
+    och vi väntar högst leverantörens timeout.
+
+    Returnerar (frames, status) där frames är {namn: DataFrame} och status är
+    {namn: {"status": "ok"/"cache"/"inaktuell"/"timeout"/"fel", "meddelande": str, "sekunder": float}}.
+    En leverantör som misslyckas utan tidigare data ger en tom DataFrame.
+    """
+    warm_cache_from_store()
+    timeouts = {**provider_settings("timeout"), **(timeouts or {})}
+    ttls = {**provider_settings("ttl"), **(ttls or {})}
+    start = time.monotonic()
+    frames = {}
+    status = {}
+    futures = {}
+    for name in PROVIDERS:
+        entry = scrape_cache.get(name)
+        if entry is None or refresh:
+            futures[name] = _submit_refresh(name)
+        elif entry.age() < ttls[name]:
+            frames[name] = entry.value
+            status[name] = {"status": "cache", "meddelande": f"Hämtad för {int(entry.age())} s sedan", "sekunder": 0.0}
+        else:
+            _submit_refresh(name)
+            frames[name] = entry.value
+            status[name] = {"status": "inaktuell", "meddelande": "Uppdateras i bakgrunden", "sekunder": 0.0}
+
+    for name, future in futures.items():
+        remaining = max(0.0, start + timeouts[name] - time.monotonic())
+        try:
+            frames[name] = future.result(timeout=remaining)
+            changeset = last_changes.get(name)
+            status[name] = {
+                "status": "ok",
+                "meddelande": changeset.summary() if changeset is not None else "",
+                "väg": fetch_paths.get(name, "http"),
+            }
+        except FutureTimeoutError:
+            status[name] = {"status": "timeout", "meddelande": f"Inget svar inom {timeouts[name]} s"}
+        except Exception as e:
+            status[name] = {"status": "fel", "meddelande": str(e)}
+        if name not in frames:
+            # Visa hellre gammal data än ingen alls
+            entry = scrape_cache.get(name)
+            frames[name] = entry.value if entry is not None else course_frame([])
+        status[name]["sekunder"] = round(time.monotonic() - start, 2)
+    frames = {name: frames[name] for name in PROVIDERS}
+    status = {name: status[name] for name in PROVIDERS}
+    return frames, status
+
+_combined = (None, None, None)
+_combined_lock = threading.Lock()
+
+def combine_frames(frames):
+    """
+    Slår ihop leverantörernas DataFrames och kurser som finns hos flera av dem
+    (se merge.py). Resultatet återanvänds så länge samma DataFrame-objekt
+    skickas in (cachen byter bara objekt vid ny data). Indexet är kursnyckeln
+    så att valda kurser kan slås upp direkt.
+    """
+    global _combined
+    parts = tuple(frames[name] for name in PROVIDERS)
+    with _combined_lock:
+        cached_parts, cached, _ = _combined
+        if cached_parts is not None and all(a is b for a, b in zip(parts, cached_parts)):
+            return cached
+    with metrics.timer("merge"):
+        combined = merge_courses(pd.concat(parts, ignore_index=True))
+        combined = combined.set_index("nyckel", drop=False).rename_axis(None)
+        aliases = key_aliases(combined)
+    with _combined_lock:
+        _combined = (parts, combined, aliases)
+    return combined
+
+def combined_aliases(combined):
+    """merge.key_aliases för en tabell från combine_frames, räknad en gång per sammanslagning."""
+    with _combined_lock:
+        _, cached, aliases = _combined
+    return aliases if combined is cached else key_aliases(combined)
+
+def read_providers_from_store(ttls=None):
+    """
+    Skrivskyddad läsning för appen när skrapningen sköts av scrape_worker.py.
+    Databasen läses bara om när en hämtning har ändrat en källa, annars
+    återanvänds cachen. Returnerar (frames, status) i samma form som
+    fetch_all_providers().
+    """
+    ttls = {**provider_settings("ttl"), **(ttls or {})}
+    frames = {}
+    status = {}
+    try:
+        hamtningar = store.last_success()
+    except Exception:
+        logger.exception("Kunde inte läsa hämtningar från databasen")
+        hamtningar = {}
+    for name in PROVIDERS:
+        hamtning = hamtningar.get(name)
+        if hamtning is None:
+            frames[name] = course_frame([])
+            status[name] = {"status": "saknas", "meddelande": "Ingen hämtning ännu", "sekunder": 0.0}
+            continue
+        stored_at = hamtning.senast_ok.timestamp()
+        entry = scrape_cache.get(name)
+        if entry is None or _store_versions.get(name) != hamtning.senast_andrad:
+            # Läs bara om källan när en hämtning faktiskt ändrat något
+            frame, _ = store.load_provider(name)
+            scrape_cache.put(name, frame, stored_at=stored_at)
+            _store_versions[name] = hamtning.senast_andrad
+        elif entry.stored_at != stored_at:
+            scrape_cache.put(name, entry.value, stored_at=stored_at)
+        entry = scrape_cache.get(name)
+        frames[name] = entry.value
+        # Räknas som inaktuell om skrapan missat mer än ett schemalagt varv
+        state = "ok" if entry.age() < 2 * ttls[name] else "inaktuell"
+        status[name] = {
+            "status": state,
+            "meddelande": f"Uppdaterad {hamtning.senast_ok:%Y-%m-%d %H:%M}",
+            "sekunder": 0.0,
+        }
+    return frames, status
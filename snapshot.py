@@ -0,0 +1,244 @@
+"""
+Ögonblicksbild av alla leverantörers kurser i kolumnformat, så att flera
+appinstanser kan dela ett och samma skrapresultat utan att läsa databasen
+eller skrapa själva.
+
+    python snapshot.py export                  # databasen -> UGL_SNAPSHOT_PATH
+    python snapshot.py export kurser.parquet   # komprimerad kopia att flytta
+    python snapshot.py import kurser.parquet   # fil -> databasen
+    python snapshot.py info kurser.arrow
+
+Filtypen väljs efter ändelsen: .parquet är komprimerad och passar för att
+flytta filen mellan maskiner, allt annat skrivs som okomprimerad Arrow IPC
+som minnesmappas när den läses. Källa, Ort och Anläggning sparas som
+kategorier (ordlistekodade) och läses tillbaka som pandas-kategorier.
+
+scrape_worker.py --snapshot skriver filen efter varje hämtning. Starta appen
+med UGL_SCRAPE_MODE=snapshot så läser den bara filen.
+"""
+import argparse
+import datetime
+import json
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet as pq
+
+from courses import COURSE_COLUMNS, course_frame
+import scrapers
+import store
+
+SNAPSHOT_PATH = os.environ.get(
+    "UGL_SNAPSHOT_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "kurser.arrow")
+)
+
+SNAPSHOT_COLUMNS = COURSE_COLUMNS + ["nyckel"]
+CATEGORY_COLUMNS = ["kalla", "ort", "anlaggning"]
+
+# Nyckel i schemats metadata för hämtningsinformation per källa
+_METADATA_KEY = b"ugl"
+
+
+def _is_parquet(path):
+    return str(path).endswith(".parquet")
+
+
+def _timestamp(value):
+    return value.isoformat(timespec="seconds") if value is not None else None
+
+
+####################################
+# Tabell <-> DataFrames
+####################################
+def to_table(frames, hamtningar=None):
+    """
+    {källa: kanonisk DataFrame} -> pyarrow.Table med alla källor under varandra.
+    hamtningar ({källa: store.Hamtning}) sparas i metadata så att läsaren kan
+    visa hur färsk varje källa är.
+    """
+    hamtningar = hamtningar or {}
+    df = pd.concat([frame[SNAPSHOT_COLUMNS] for frame in frames.values()], ignore_index=True)
+    df = df.astype({column: "category" for column in CATEGORY_COLUMNS})
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sources = {}
+    for name, frame in frames.items():
+        hamtning = hamtningar.get(name)
+        sources[name] = {
+            "rader": len(frame),
+            "senast_ok": _timestamp(hamtning.senast_ok) if hamtning else None,
+            "senast_andrad": _timestamp(hamtning.senast_andrad) if hamtning else None,
+        }
+    metadata = {"skapad": _timestamp(datetime.datetime.now()), "kallor": sources}
+    return table.replace_schema_metadata({**table.schema.metadata, _METADATA_KEY: json.dumps(metadata).encode()})
+
+
+def table_metadata(table):
+    """{"skapad": ..., "kallor": {källa: {"rader", "senast_ok", "senast_andrad"}}}"""
+    return json.loads(table.schema.metadata[_METADATA_KEY])
+
+
+def to_frames(table):
+    """pyarrow.Table -> {källa: DataFrame} med kategorikolumner, i samma ordning som när den skrevs."""
+    df = table.to_pandas()
+    # Uppdelningen behåller samma kategorier i alla delar, så pd.concat av
+    # dem ger fortfarande kategorikolumner
+    return {
+        name: df[df["kalla"] == name].reset_index(drop=True)
+        for name in table_metadata(table)["kallor"]
+    }
+
+
+####################################
+# Filer
+####################################
+def write_table(table, path=SNAPSHOT_PATH):
+    tmp = f"{path}.tmp"
+    if _is_parquet(path):
+        pq.write_table(table, tmp, compression="zstd")
+    else:
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    # Byts atomiskt: läsare som redan mappat den gamla filen behåller den
+    os.replace(tmp, path)
+
+
+def read_table(path=SNAPSHOT_PATH):
+    if _is_parquet(path):
+        return pq.read_table(path, memory_map=True)
+    return pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+
+
+def export(path=SNAPSHOT_PATH):
+    """Skriver alla källor som finns i databasen till path. Returnerar antalet kurser."""
+    hamtningar = store.last_success()
+    frames = {}
+    for name in scrapers.PROVIDERS:
+        stored = store.load_provider(name) if name in hamtningar else None
+        frames[name] = stored[0] if stored is not None else course_frame([])
+    table = to_table(frames, hamtningar)
+    write_table(table, path)
+    return table.num_rows
+
+
+def import_into_store(path):
+    """Sparar filens källor i databasen (inkrementellt, se store.save_provider_frame)."""
+    changesets = {}
+    for name, frame in to_frames(read_table(path)).items():
+        provider = scrapers.PROVIDERS.get(name)
+        frame = course_frame(frame.astype({column: str for column in CATEGORY_COLUMNS}))
+        changesets[name] = store.save_provider_frame(name, frame, hemsida=provider.url if provider else "")
+    return changesets
+
+
+####################################
+# Läsning i appen
+####################################
+_loaded = None
+_loaded_lock = threading.Lock()
+
+
+def _file_version(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def _missing(message):
+    frames = {name: course_frame([]) for name in scrapers.PROVIDERS}
+    status = {name: {"status": "saknas", "meddelande": message, "sekunder": 0.0} for name in scrapers.PROVIDERS}
+    return frames, status
+
+
+def read_providers_from_snapshot(path=SNAPSHOT_PATH, ttls=None):
+    """
+    Skrivskyddad läsning för appen när scrape_worker.py skriver en
+    ögonblicksbild. Filen läses bara om när den har bytts ut, och en källa
+    som inte ändrats sedan förra filen behåller samma DataFrame så att
+    cachade sammanslagningar och kort fortfarande gäller. Returnerar
+    (frames, status) i samma form som scrapers.fetch_all_providers().
+    """
+    global _loaded
+    ttls = {**scrapers.provider_settings("ttl"), **(ttls or {})}
+    version = _file_version(path)
+    if version is None:
+        return _missing("Ingen ögonblicksbild ännu")
+    with _loaded_lock:
+        loaded = _loaded
+    if loaded is None or loaded[0] != (path, version):
+        table = read_table(path)
+        metadata = table_metadata(table)
+        frames = to_frames(table)
+        if loaded is not None:
+            previous_sources, previous_frames = loaded[1]["kallor"], loaded[2]
+            for name, source in metadata["kallor"].items():
+                previous = previous_sources.get(name)
+                if previous and source["senast_andrad"] and previous["senast_andrad"] == source["senast_andrad"]:
+                    frames[name] = previous_frames[name]
+        loaded = ((path, version), metadata, frames)
+        with _loaded_lock:
+            _loaded = loaded
+    _, metadata, stored_frames = loaded
+
+    now = datetime.datetime.now()
+    frames = {}
+    status = {}
+    for name in scrapers.PROVIDERS:
+        source = metadata["kallor"].get(name) or {}
+        if not source.get("senast_ok"):
+            frames[name] = course_frame([])
+            status[name] = {"status": "saknas", "meddelande": "Ingen hämtning ännu", "sekunder": 0.0}
+            continue
+        senast_ok = datetime.datetime.fromisoformat(source["senast_ok"])
+        frames[name] = stored_frames[name]
+        # Räknas som inaktuell om skrapan missat mer än ett schemalagt varv
+        state = "ok" if (now - senast_ok).total_seconds() < 2 * ttls[name] else "inaktuell"
+        status[name] = {
+            "status": state,
+            "meddelande": f"Uppdaterad {senast_ok:%Y-%m-%d %H:%M}",
+            "sekunder": 0.0,
+        }
+    return frames, status
+
+
+####################################
+# Kommandorad
+####################################
+def print_info(path):
+    table = read_table(path)
+    metadata = table_metadata(table)
+    print(f"{path}: {table.num_rows} kurser, {os.path.getsize(path) / 1024:.0f} kB, skapad {metadata['skapad']}")
+    for name, source in metadata["kallor"].items():
+        print(f"{name:<12} {source['rader']:>5} kurser  senast hämtad {source['senast_ok'] or 'aldrig'}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporterar och importerar ögonblicksbilder av kursdatabasen.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for command, help in (
+        ("export", "skriv databasens kurser till en fil"),
+        ("import", "läs in en fil i databasen"),
+        ("info", "visa vad en fil innehåller"),
+    ):
+        sub = commands.add_parser(command, help=help)
+        sub.add_argument("path", nargs="?", default=SNAPSHOT_PATH,
+                         help=".parquet eller .arrow (standard: UGL_SNAPSHOT_PATH)")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        rows = export(args.path)
+        print(f"{rows} kurser skrivna till {args.path}")
+    elif args.command == "import":
+        for name, changeset in import_into_store(args.path).items():
+            print(f"{name:<12} {changeset.summary()}")
+    else:
+        print_info(args.path)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,166 @@
+import datetime
+import os
+import threading
+import urllib.parse
+
+import pandas as pd
+from sqlalchemy import create_engine, event, insert, inspect
+from sqlalchemy.orm import sessionmaker
+
+from changes import content_hash, diff
+from courses import COURSE_COLUMNS, course_frame, format_dates, format_price, format_seats
+from models import Base, Hamtning, Kurs
+
+# Lokal SQLite-databas med senast skrapade kurser
+DB_PATH = os.environ.get("UGL_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "kurser.db"))
+
+engine = create_engine(f"sqlite:///{DB_PATH}", connect_args={"check_same_thread": False})
+Session = sessionmaker(bind=engine, expire_on_commit=False)
+_init_lock = threading.Lock()
+_initialized = False
+
+
+@event.listens_for(engine, "connect")
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL låter läsare (appen) och skrivare (skrapan) arbeta samtidigt
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+def _schema_is_current():
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        if existing != {c.name for c in table.columns}:
+            return False
+    return True
+
+
+def init_db():
+    global _initialized
+    with _init_lock:
+        if not _initialized:
+            # Databasen är bara en cache av skrapad data, så vid schemaändring
+            # börjar vi om i stället för att migrera
+            if not _schema_is_current():
+                Base.metadata.drop_all(engine)
+            Base.metadata.create_all(engine)
+            _initialized = True
+
+
+def _value(value):
+    """pandas-värden (NaT, NA, numpy-tal, Timestamp) -> vanliga Python-värden."""
+    if pd.isna(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.date()
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def _row_values(row, hemsida):
+    row = {column: _value(row[column]) for column in COURSE_COLUMNS + ["nyckel"]}
+    anlaggning = row["anlaggning"] or ""
+    ort = row["ort"] or ""
+    values = {
+        "nyckel": row["nyckel"],
+        "kalla": row["kalla"],
+        "namn": "UGL",
+        "datum": format_dates(row["start"], row["slut"]),
+        "start": row["start"],
+        "slut": row["slut"],
+        "ar": row["ar"],
+        "vecka": row["vecka"],
+        "platser": format_seats(row["platser"], row["platser_status"]),
+        "platser_antal": row["platser"],
+        "platser_status": row["platser_status"],
+        "plats": anlaggning,
+        "ort": ort,
+        "pris": format_price(row["pris_kr"]),
+        "pris_kr": row["pris_kr"],
+        "hemsida": hemsida,
+        "maps": "https://www.google.com/maps/search/?api=1&query="
+                + urllib.parse.quote(", ".join(p for p in (anlaggning, ort) if p)),
+        "handledare": row["handledare"],
+    }
+    values["innehall_hash"] = content_hash(values)
+    return values
+
+
+def save_provider_frame(kalla, frame, hemsida=""):
+    """
+    Sparar en leverantörs kurser inkrementellt: bara nya, ändrade och borttagna
+    kurser skrivs. frame är en kanonisk DataFrame (courses.course_frame) med
+    nyckel. Returnerar en changes.ChangeSet.
+    """
+    init_db()
+    records = {}
+    for row in frame.to_dict("records"):
+        values = _row_values(row, hemsida)
+        records[values["nyckel"]] = values
+    now = datetime.datetime.now()
+    with Session() as session, session.begin():
+        old_hashes = dict(session.query(Kurs.nyckel, Kurs.innehall_hash).filter(Kurs.kalla == kalla))
+        changeset = diff(old_hashes, {key: values["innehall_hash"] for key, values in records.items()})
+        if changeset.inserted:
+            session.execute(insert(Kurs), [records[key] for key in changeset.inserted])
+        for chunk in _chunks(changeset.updated):
+            for kurs in session.query(Kurs).filter(Kurs.nyckel.in_(chunk)):
+                for attr, value in records[kurs.nyckel].items():
+                    setattr(kurs, attr, value)
+        for chunk in _chunks(changeset.removed):
+            session.query(Kurs).filter(Kurs.nyckel.in_(chunk)).delete(synchronize_session=False)
+        hamtning = session.get(Hamtning, kalla) or Hamtning(kalla=kalla)
+        hamtning.senast_ok = now
+        hamtning.rader = len(records)
+        if changeset or hamtning.senast_andrad is None:
+            hamtning.senast_andrad = now
+        session.add(hamtning)
+    return changeset
+
+
+def _chunks(keys, size=500):
+    # SQLite begränsar antalet parametrar per fråga
+    for i in range(0, len(keys), size):
+        yield keys[i:i + size]
+
+
+def _to_frame(kurser):
+    return course_frame([{
+        "kalla": k.kalla,
+        "start": k.start,
+        "slut": k.slut,
+        "ar": k.ar,
+        "vecka": k.vecka,
+        "anlaggning": k.plats,
+        "ort": k.ort,
+        "handledare": k.handledare,
+        "pris_kr": k.pris_kr,
+        "platser": k.platser_antal,
+        "platser_status": k.platser_status,
+    } for k in kurser])
+
+
+def load_provider(kalla):
+    """Returnerar (DataFrame, senast_ok) för källan, eller None om den aldrig hämtats."""
+    init_db()
+    with Session() as session:
+        hamtning = session.get(Hamtning, kalla)
+        if hamtning is None:
+            return None
+        # I id-ordning ligger 'nyckel#2' alltid efter 'nyckel', så course_frame
+        # numrerar kurserna likadant igen
+        kurser = session.query(Kurs).filter(Kurs.kalla == kalla).order_by(Kurs.id).all()
+        return _to_frame(kurser), hamtning.senast_ok
+
+
+def last_success():
+    """Returnerar {källa: Hamtning} med senaste lyckade hämtning per källa."""
+    init_db()
+    with Session() as session:
+        return {h.kalla: h for h in session.query(Hamtning).all()}
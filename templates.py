@@ -0,0 +1,204 @@
+"""
+HTML-mallar för kurskort och mail. Varje mall delas upp i text och fält en
+gång vid import; render() fyller i fälten med en enda join och HTML-escapar
+alla värden som inte redan är Markup.
+
+Kurskort och mailrader cachas per kursinnehåll: samma kurs renderas bara en
+gång oavsett hur många omkörningar, sidbyten eller val det blir. Escapade
+värden cachas per text och mailets tabell per urval.
+"""
+import functools
+import html
+import operator
+import string
+
+from courses import display_row, format_seats, seats_color
+
+# Antal renderade kort/rader som sparas
+CACHE_SIZE = 8192
+
+
+class Markup(str):
+    """Färdig HTML som inte ska escapas igen."""
+
+
+def _escape(value):
+    """Värde -> HTML-säker text. Markup lämnas orörd, None blir tom text."""
+    if isinstance(value, Markup):
+        return value
+    return _escape_text("" if value is None else str(value))
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _escape_text(text):
+    # Samma anläggningar, orter, priser och källor återkommer på många rader
+    return html.escape(text)
+
+
+class Template:
+    """Mall med {fält}. Fälten escapas vid render() om de inte är Markup."""
+
+    def __init__(self, text):
+        # (text, None) för text och (None, fält) för fält, i ordning
+        self.parts = []
+        for literal, field, _, _ in string.Formatter().parse(text):
+            self.parts.append((literal, None))
+            if field is not None:
+                self.parts.append((None, field))
+
+    def render(self, **values):
+        # En enda join: stora fält (t.ex. mailets tabell) kopieras inte i onödan
+        return Markup("".join([
+            literal if field is None else _escape(values[field])
+            for literal, field in self.parts
+        ]))
+
+
+####################################
+# Kurskort (app.py avsnitt 9)
+####################################
+SPOTS = Template('<span style="color: {color}; font-weight: bold;">✅</span> {text}')
+
+CARD = Template("""
+<div style="margin-bottom: 1em;">
+  <span style="white-space: nowrap;">{vecka} &nbsp; <strong>{datum}</strong></span><br>
+  🏨 <strong>{anlaggning}</strong><br>
+  📍 <strong>{ort}</strong><br>
+  💰 <strong>{pris}</strong> &nbsp; {spots}<br>
+  👥 <strong>{handledare}</strong><br>
+  {kalla}
+</div>
+""")
+
+# Fälten i en kanonisk rad som kortet bygger på
+CARD_FIELDS = (
+    "vecka", "start", "slut", "anlaggning", "ort", "handledare",
+    "pris_kr", "platser", "platser_status", "kalla", "kallor",
+)
+
+
+_card_key = operator.itemgetter(*CARD_FIELDS[:-1])
+
+
+def course_card(row):
+    """Kanonisk rad (dict) -> (visningsdict enligt courses.display_row, kortets html)."""
+    # kallor finns bara efter sammanslagning (merge.py)
+    return _course_card(_card_key(row) + (row.get("kallor"),))
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _course_card(values):
+    row = dict(zip(CARD_FIELDS, values))
+    course = display_row(row)
+    spots = SPOTS.render(
+        color=seats_color(row["platser"], row["platser_status"]),
+        text=format_seats(row["platser"], row["platser_status"]),
+    )
+    card = CARD.render(
+        vecka=course["Vecka"], datum=course["Datum"], anlaggning=course["Anläggning"],
+        ort=course["Ort"], pris=course["Pris"], spots=spots,
+        handledare=course["Handledare"], kalla=course["Källa"],
+    )
+    return course, card
+
+
+####################################
+# Mail med valda kurser (app.py avsnitt 11)
+####################################
+SELECTION_ROW = Template("""
+  <tr>
+    <td>{vecka}<br>Pris: {pris}</td>
+    <td>{datum}</td>
+    <td>{anlaggning}</td>
+    <td>{ort}</td>
+    <td>{kalla}</td>
+  </tr>
+""")
+
+SELECTION_MAIL = Template("""
+Hej {namn},<br>
+Namn: {namn} &nbsp;&nbsp; Telefon: {telefon}<br>
+Mailadress: {mail}<br>
+Förfrågan ID: {req_id}<br><br>
+Här kommer dina valda kurser:<br><br>
+<table border="1" style="border-collapse: collapse;">
+  <tr>
+    <th>Vecka & Pris</th>
+    <th>Datum</th>
+    <th>Anläggning</th>
+    <th>Ort</th>
+    <th>Källa</th>
+  </tr>
+{rows}
+</table>
+<br>
+Hälsningar,<br>
+Ditt Företag
+""")
+
+
+_selection_key = operator.itemgetter("Vecka", "Pris", "Datum", "Anläggning", "Ort", "Källa")
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _selection_row(values):
+    vecka, pris, datum, anlaggning, ort, kalla = values
+    return SELECTION_ROW.render(vecka=vecka, pris=pris, datum=datum, anlaggning=anlaggning, ort=ort, kalla=kalla)
+
+
+@functools.lru_cache(maxsize=32)
+def _selection_rows(keys):
+    return Markup("".join([_selection_row(values) for values in keys]))
+
+
+def selection_mail(selected_courses, namn, telefon, mail, req_id):
+    """Valda kurser (visningsdicts) -> mailets html."""
+    # Hela tabellen cachas per urval: en omkörning med samma val är ett uppslag
+    rows = _selection_rows(tuple(map(_selection_key, selected_courses)))
+    return SELECTION_MAIL.render(namn=namn, telefon=telefon, mail=mail, req_id=req_id, rows=rows)
+
+
+####################################
+# Kursöversikt från databasen (email_utils.generera_html_mail)
+####################################
+OVERVIEW_ROW = Template("""
+    <tr>
+        <td>{namn}</td>
+        <td>{datum}</td>
+        <td>{plats}</td>
+        <td>{pris}</td>
+        <td>{platser}</td>
+        <td><a href="{hemsida}">Webbplats</a></td>
+        <td><a href="{maps}">Karta</a></td>
+    </tr>
+""")
+
+OVERVIEW_MAIL = Template("""
+<html>
+<body>
+<h2>Hej {namn},</h2>
+<p>Här är de UGL-kurser du visat intresse för:</p>
+<table border="1" cellpadding="6" cellspacing="0" style="border-collapse: collapse;">
+    <tr style="background-color:#f2f2f2;">
+        <th>Kurs</th><th>Datum</th><th>Plats</th><th>Pris</th><th>Platstillgång</th><th>Hemsida</th><th>Karta</th>
+    </tr>
+    {rows}
+</table>
+<br>
+<p>Hör gärna av dig om du har frågor eller vill boka.</p>
+<p>Med vänliga hälsningar,<br>Ditt Kursbokningsteam</p>
+</body>
+</html>
+""")
+
+
+def overview_mail(kurser, namn):
+    """Kurs-objekt (models.Kurs) -> mailets html."""
+    rows = Markup("".join([
+        OVERVIEW_ROW.render(
+            namn=k.namn, datum=k.datum, plats=k.plats, pris=k.pris,
+            platser=k.platser, hemsida=k.hemsida, maps=k.maps,
+        )
+        for k in kurser
+    ]))
+    return OVERVIEW_MAIL.render(namn=namn, rows=rows)
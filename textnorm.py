@@ -0,0 +1,65 @@
+"""
+Normalisering av celltext från leverantörernas tabeller: namn, priser,
+antal platser och veckonummer. Alla mönster kompileras en gång här och
+delas av Uglkurser, Rezon och Corecode (se scrapers.py och courses.py).
+
+Samma celltext (ort, pris, handledare) återkommer på många rader, så varje
+hjälpfunktion cachas per unik text, som datumtolkningen i dates.py.
+"""
+import functools
+import re
+
+CACHE_SIZE = 4096
+
+# 'AnnaSvensson' -> 'Anna Svensson': gräns mellan liten och stor bokstav
+_CAMEL = re.compile(r"(?<=[a-zåäö])(?=[A-ZÅÄÖ])")
+# Ett ord som börjar med stor bokstav, fram till nästa stora bokstav
+_CAPITALISED = re.compile(r"[A-ZÅÄÖ][^A-ZÅÄÖ]+")
+_NON_DIGIT = re.compile(r"\D")
+# '24 500 kr + 3 900 kr' -> ['24 500 ', '3 900 ']
+_PRICE = re.compile(r"(\d[\d\s]*)\s*kr")
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def split_words(text):
+    """Sätter in mellanslag där ord har skrivits ihop: 'AnnaSvensson' -> 'Anna Svensson'."""
+    return _CAMEL.sub(" ", text)
+
+
+def join_names(first, second):
+    if first and second:
+        return f"{first} {second}"
+    return first or second
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def split_names(text):
+    """
+    Ihopskriven handledartext -> (förnamn, resten), t.ex. 'AnnaSvensson' ->
+    ('Anna', 'Svensson'). Utan två ord med stor bokstav delas texten på första
+    mellanslaget.
+    """
+    words = _CAPITALISED.findall(text)
+    if len(words) >= 2:
+        return words[0].strip(), words[1].strip()
+    parts = split_words(text).split()
+    if len(parts) >= 2:
+        return parts[0], " ".join(parts[1:])
+    return split_words(text), ""
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def to_int(text):
+    """Alla siffror i texten som ett heltal: '24 900 kr' -> 24900, None om det inte finns några."""
+    digits = _NON_DIGIT.sub("", text or "")
+    return int(digits) if digits else None
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def sum_prices(text):
+    """Summan av alla 'N kr' i texten, None om det inte finns något belopp."""
+    amounts = _PRICE.findall(text or "")
+    if not amounts:
+        return None
+    # Beloppen består bara av siffror och blanktecken (även hårda mellanslag)
+    return sum(int("".join(amount.split())) for amount in amounts)
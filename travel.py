@@ -0,0 +1,154 @@
+"""
+Restider mellan orter. Orter och koordinater läses en gång från data/orter.csv
+och en matris ort x ort med uppskattade restider (bil och kollektivt) räknas
+fram vid första användningen. Kända restider i OVERRIDES går före uppskattningen.
+"""
+import csv
+import difflib
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "orter.csv")
+
+MODES = ("Bil", "Kollektivt")
+
+# Vägavstånd är i snitt ungefär så här mycket längre än fågelvägen
+ROAD_FACTOR = 1.25
+CAR_SPEED_KMH = 75
+# Kollektivt: långsammare än bil plus tid för byten och väntan
+TRANSIT_FACTOR = 1.3
+TRANSIT_OVERHEAD_H = 0.5
+
+# Uppmätta restider i timmar: {färdsätt: {(från, till): timmar}}, gäller åt båda hållen
+OVERRIDES = {
+    "Bil": {
+        ("västerås", "eskilstuna"): 1.0,
+        ("kiruna", "eskilstuna"): 6.0,
+        ("stockholm", "eskilstuna"): 1.5,
+    },
+    "Kollektivt": {
+        ("västerås", "eskilstuna"): 2.0,
+        ("kiruna", "eskilstuna"): 8.0,
+        ("stockholm", "eskilstuna"): 2.5,
+    },
+}
+
+# Vanliga smeknamn och stavningar
+ALIASES = {
+    "sthlm": "stockholm",
+    "gbg": "göteborg",
+    "gothenburg": "göteborg",
+}
+
+_FOLD = str.maketrans("åäöéü", "aaoeu")
+_NOT_LETTERS = re.compile(r"[^a-zåäöéü ]+")
+_KOMMUN = re.compile(r"\bkommun\b")
+
+
+def normalise(text):
+    """'📍 Västerås kommun' -> 'västerås'."""
+    text = _NOT_LETTERS.sub(" ", str(text or "").lower())
+    text = _KOMMUN.sub(" ", text)
+    return " ".join(text.split())
+
+
+def fold(text):
+    return text.translate(_FOLD)
+
+
+def _haversine_km(lat, lon):
+    lat = np.radians(lat)
+    lon = np.radians(lon)
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat[:, None]) * np.cos(lat[None, :]) * np.sin(dlon / 2) ** 2
+    return 2 * 6371 * np.arcsin(np.sqrt(a))
+
+
+class TravelMatrix:
+    def __init__(self, names, lat, lon):
+        self.names = list(names)
+        self._index = {normalise(name): i for i, name in enumerate(self.names)}
+        self._folded = {fold(key): i for key, i in self._index.items()}
+        self._resolved = {}
+        self._lock = threading.Lock()
+
+        car = _haversine_km(np.asarray(lat, dtype=float), np.asarray(lon, dtype=float)) * ROAD_FACTOR / CAR_SPEED_KMH
+        transit = car * TRANSIT_FACTOR + TRANSIT_OVERHEAD_H
+        np.fill_diagonal(transit, 0.0)
+        self.hours = {"Bil": car, "Kollektivt": transit}
+        for mode, pairs in OVERRIDES.items():
+            for (a, b), value in pairs.items():
+                i, j = self._index.get(a), self._index.get(b)
+                if i is not None and j is not None:
+                    self.hours[mode][i, j] = self.hours[mode][j, i] = value
+
+    @classmethod
+    def from_csv(cls, path=DATA_PATH):
+        names, lat, lon = [], [], []
+        with open(path, encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                names.append(row["ort"])
+                lat.append(float(row["lat"]))
+                lon.append(float(row["lon"]))
+        return cls(names, lat, lon)
+
+    def _lookup(self, key):
+        key = ALIASES.get(key, key)
+        if key in self._index:
+            return self._index[key]
+        return self._folded.get(fold(key))
+
+    def resolve(self, text):
+        """Ortnamn i valfri form -> radindex i matrisen, eller None om orten är okänd."""
+        key = normalise(text)
+        with self._lock:
+            if key in self._resolved:
+                return self._resolved[key]
+        index = self._lookup(key) if key else None
+        if index is None and key:
+            # 'Slott Eskilstuna', 'Gällöfsta Kungsängen': prova orden bakifrån
+            for word in reversed(key.split()):
+                index = self._lookup(word)
+                if index is not None:
+                    break
+        if index is None and key:
+            close = difflib.get_close_matches(fold(key), list(self._folded), n=1, cutoff=0.8)
+            index = self._folded[close[0]] if close else None
+        with self._lock:
+            self._resolved[key] = index
+        return index
+
+    def travel_hours(self, orts, origin, mode):
+        """
+        Restid från origin till varje ort i Series orts (NaN där orten är okänd).
+        Varje unik ort slås upp en gång, sedan är det ett indexuppslag per rad.
+        Returnerar None om origin inte går att känna igen.
+        """
+        origin_index = self.resolve(origin)
+        if origin_index is None:
+            return None
+        codes, uniques = pd.factorize(orts)
+        dest = np.array([self.resolve(u) for u in uniques], dtype=object)
+        known = np.array([d is not None for d in dest], dtype=bool)
+        row = self.hours.get(mode, self.hours["Bil"])[origin_index]
+        per_unique = np.full(len(uniques) + 1, np.nan)
+        per_unique[:-1][known] = row[dest[known].astype(int)]
+        # factorize ger -1 för saknade värden, vilket pekar på sista (NaN) platsen
+        return pd.Series(per_unique[codes], index=orts.index)
+
+
+_matrix = None
+_matrix_lock = threading.Lock()
+
+
+def get_matrix():
+    global _matrix
+    with _matrix_lock:
+        if _matrix is None:
+            _matrix = TravelMatrix.from_csv()
+        return _matrix